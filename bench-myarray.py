@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:02:11 2026
+
+Microbenchmark of `myarray.array` subclass overhead vs plain `ndarray`s with
+the free functions `mt`, `col`, `row`, `scal`, for the small batches used in
+`dbatch` loops.
+"""
+from timeit import repeat
+import numpy as np
+from rand_mfld_proj.myarray import (array, norm, matmul, row, col, mt, uncol,
+                                    scal)
+
+
+def cone_step_sub(x: array, y: array) -> array:
+    """Body of `inter_cell.make_y` with the subclass properties"""
+    y /= norm(y, keepdims=True)
+    cos_phi = (y.r @ x.c).uc
+    y *= np.sqrt(1 - cos_phi**2)
+    return (y.t @ y).s
+
+
+def cone_step_plain(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Body of `inter_cell.make_y` with plain ndarrays.
+
+    Uses the same `matmul` gufunc as `array.__matmul__`.
+    """
+    y /= norm(y, keepdims=True)
+    cos_phi = uncol(matmul(row(y), col(x)))
+    y *= np.sqrt(1 - cos_phi**2)
+    return scal(matmul(mt(y), y))
+
+
+def time_it(func, x, y, number: int, reps: int) -> float:
+    """Best time per call, in microseconds"""
+    best = min(repeat(lambda: func(x, y.copy()), number=number, repeat=reps))
+    return 1e6 * best / number
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    print('{:>12} {:>12} {:>12} {:>8}'.format('batch', 'array/us',
+                                              'ndarray/us', 'ratio'))
+    for batch in (10, 100, 1000):
+        xp = np.random.randn(3, 5)
+        xp /= norm(xp, keepdims=True)
+        yp = np.random.randn(batch, 3, 5)
+        xs, ys = xp.view(array), yp.view(array)
+        t_sub = time_it(cone_step_sub, xs, ys, 2000, 5)
+        t_plain = time_it(cone_step_plain, xp, yp, 2000, 5)
+        print('{:>12} {:>12.2f} {:>12.2f} {:>8.2f}'.format(
+            batch, t_sub, t_plain, t_sub / t_plain))
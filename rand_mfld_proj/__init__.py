@@ -14,6 +14,8 @@ run
     Functions for simply generating data and plots.
 disp_counter
     Displaying progress of `for` loops.
+backend
+    Information about, and thread control of, the BLAS/LAPACK libraries.
 
 Subpackages
 ===========
@@ -24,5 +26,7 @@ mfld
 proj_mfld
     Comparing simulations and formulae for distortion of random manifolds.
 """
-from . import proj, mfld, proj_mfld, run, iter_tricks, myarray
-assert all((proj, mfld, proj_mfld, run, iter_tricks, myarray))
+from . import proj, mfld, proj_mfld, run, iter_tricks, myarray, backend
+from .backend import backend_info, set_blas_threads
+assert all((proj, mfld, proj_mfld, run, iter_tricks, myarray, backend))
+assert all((backend_info, set_blas_threads))
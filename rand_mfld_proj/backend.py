@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:20:36 2026
+
+Runtime information about, and control of, the BLAS/LAPACK library that the
+`_gufuncs_blas` and `_gufuncs_lapack` extensions are linked against.
+
+The library is found by resolving a BLAS symbol through the extension module
+and asking the dynamic linker which file it came from. Thread counts and
+versions are then read through the library's own API, as in `threadpoolctl`.
+
+Functions
+---------
+backend_info
+    Library, version and number of threads for each BLAS/LAPACK in use.
+set_blas_threads
+    Set the number of threads used by the BLAS/LAPACK libraries.
+blas_threads
+    Context manager that sets the number of BLAS threads temporarily.
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence
+import ctypes
+import ctypes.util
+import os
+import re
+from . import _gufuncs_blas, _gufuncs_lapack
+
+# =============================================================================
+# Library APIs
+# =============================================================================
+
+# Symbols used to identify the libraries, for each extension module.
+# LAPACK can be in a separate library that calls BLAS, so probe both.
+_PROBES = {_gufuncs_blas: (('dgemm_', 'dgemm'),),
+           _gufuncs_lapack: (('dgeqrf_', 'dgeqrf'), ('dtrsm_', 'dtrsm'))}
+# Decorations of symbol names used by some builds, e.g. numpy's openblas.
+_PREFIXES = ('', 'scipy_')
+_SUFFIXES = ('', '64_')
+# Name of library API: parts of file name that identify it.
+_FILENAMES = {'openblas': ('openblas',),
+              'mkl': ('mkl_rt', 'libmkl'),
+              'blis': ('blis',),
+              'flexiblas': ('flexiblas',)}
+
+
+class _Library():
+    """A loaded BLAS/LAPACK library, with functions from its API.
+
+    Parameters
+    ----------
+    filepath : str
+        Path to shared library file.
+    """
+    filepath: str
+    internal_api: str
+    modules: List[str]
+    _dll: ctypes.CDLL
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.modules = []
+        name = os.path.basename(filepath).lower()
+        self.internal_api = 'unknown'
+        for api, parts in _FILENAMES.items():
+            if any(part in name for part in parts):
+                self.internal_api = api
+                break
+        # already loaded by the extension, so this returns the same handle
+        self._dll = ctypes.CDLL(filepath)
+
+    def _func(self, name: str, restype=ctypes.c_int) -> Optional[Callable]:
+        """Function `name` from library, or None if not present"""
+        for prefix in _PREFIXES:
+            for suffix in _SUFFIXES:
+                func = getattr(self._dll, prefix + name + suffix, None)
+                if func is not None:
+                    func.restype = restype
+                    return func
+        return None
+
+    def get_num_threads(self) -> Optional[int]:
+        """Current maximum number of threads, None if unknown"""
+        func = self._func({'openblas': 'openblas_get_num_threads',
+                           'mkl': 'MKL_Get_Max_Threads',
+                           'blis': 'bli_thread_get_num_threads',
+                           'flexiblas': 'flexiblas_get_num_threads',
+                           }.get(self.internal_api, ''))
+        if func is None:
+            return None
+        return func()
+
+    def set_num_threads(self, num_threads: int) -> bool:
+        """Set maximum number of threads. Returns False if not possible"""
+        func = self._func({'openblas': 'openblas_set_num_threads',
+                           'mkl': 'MKL_Set_Num_Threads',
+                           'blis': 'bli_thread_set_num_threads',
+                           'flexiblas': 'flexiblas_set_num_threads',
+                           }.get(self.internal_api, ''), None)
+        if func is None:
+            return False
+        func(num_threads)
+        return True
+
+    def version(self) -> Optional[str]:
+        """Version string, None if unknown"""
+        if self.internal_api == 'openblas':
+            func = self._func('openblas_get_config', ctypes.c_char_p)
+            if func is None:
+                return None
+            match = re.search(r'OpenBLAS ([\d.]+)', func().decode())
+            return match and match.group(1)
+        if self.internal_api == 'mkl':
+            func = self._func('MKL_Get_Version_String', None)
+            if func is None:
+                return None
+            buf = ctypes.create_string_buffer(200)
+            func(buf, len(buf))
+            match = re.search(r'Version ([^ ]+) ', buf.value.decode())
+            return match and match.group(1)
+        if self.internal_api == 'blis':
+            func = self._func('bli_info_get_version_str', ctypes.c_char_p)
+            return None if func is None else func().decode()
+        if self.internal_api == 'flexiblas':
+            func = self._func('flexiblas_get_version', None)
+            if func is None:
+                return None
+            nums = [ctypes.c_int() for _ in range(3)]
+            func(*(ctypes.byref(num) for num in nums))
+            return '.'.join(str(num.value) for num in nums)
+        return None
+
+    def threading_layer(self) -> Optional[str]:
+        """Threading layer used by openblas, None if unknown"""
+        if self.internal_api != 'openblas':
+            return None
+        func = self._func('openblas_get_parallel')
+        if func is None:
+            return None
+        return {0: 'disabled', 1: 'pthreads', 2: 'openmp'}.get(func())
+
+    def info(self) -> Dict[str, object]:
+        """Dictionary describing library"""
+        return {'internal_api': self.internal_api,
+                'filepath': self.filepath,
+                'version': self.version(),
+                'num_threads': self.get_num_threads(),
+                'threading_layer': self.threading_layer(),
+                'modules': list(self.modules)}
+
+
+# =============================================================================
+# Finding libraries
+# =============================================================================
+
+
+class _DlInfo(ctypes.Structure):
+    """Output of `dladdr`"""
+    _fields_ = [("dli_fname", ctypes.c_char_p),
+                ("dli_fbase", ctypes.c_void_p),
+                ("dli_sname", ctypes.c_char_p),
+                ("dli_saddr", ctypes.c_void_p)]
+
+
+def _dladdr() -> Optional[Callable]:
+    """The `dladdr` function from libc or libdl, None if not available"""
+    for libname in (None, ctypes.util.find_library('dl')):
+        try:
+            func = ctypes.CDLL(libname).dladdr
+        except (OSError, AttributeError, TypeError):
+            continue
+        func.argtypes = [ctypes.c_void_p, ctypes.POINTER(_DlInfo)]
+        func.restype = ctypes.c_int
+        return func
+    return None
+
+
+def _symbol_file(module, symbols: Sequence[str]) -> Optional[str]:
+    """Path of file providing one of `symbols` to extension `module`"""
+    dladdr = _dladdr()
+    if dladdr is None:
+        return None
+    ext = ctypes.CDLL(module.__file__)
+    for symbol in symbols:
+        func = getattr(ext, symbol, None)
+        if func is None:
+            continue
+        info = _DlInfo()
+        if dladdr(ctypes.cast(func, ctypes.c_void_p), ctypes.byref(info)):
+            return os.path.realpath(info.dli_fname.decode())
+    return None
+
+
+_LIBRARIES: Optional[List[_Library]] = None
+
+
+def _libraries() -> List[_Library]:
+    """Libraries used by extension modules, found on first call"""
+    global _LIBRARIES
+    if _LIBRARIES is None:
+        libs = {}
+        for module, probes in _PROBES.items():
+            modname = module.__name__.split('.')[-1]
+            for symbols in probes:
+                filepath = _symbol_file(module, symbols)
+                if filepath is None:
+                    continue
+                if filepath not in libs:
+                    libs[filepath] = _Library(filepath)
+                if modname not in libs[filepath].modules:
+                    libs[filepath].modules.append(modname)
+        _LIBRARIES = list(libs.values())
+    return _LIBRARIES
+
+
+# =============================================================================
+# Public interface
+# =============================================================================
+
+
+def backend_info() -> List[Dict[str, object]]:
+    """Library, version and number of threads for each BLAS/LAPACK in use.
+
+    Returns
+    -------
+    info : List[Dict[str, object]]
+        One dictionary per library, with keys:
+        internal_api
+            'openblas', 'mkl', 'blis', 'flexiblas' or 'unknown'.
+        filepath
+            Path to shared library file.
+        version
+            Version string, None if unknown.
+        num_threads
+            Maximum number of threads, None if unknown.
+        threading_layer
+            For openblas: 'pthreads', 'openmp' or 'disabled', else None.
+        modules
+            Names of extension modules that use this library.
+        Empty if the libraries cannot be found, e.g. without `dladdr`.
+    """
+    return [lib.info() for lib in _libraries()]
+
+
+def set_blas_threads(num_threads: Optional[int] = 1) -> Dict[str, int]:
+    """Set the number of threads used by the BLAS/LAPACK libraries.
+
+    Use `num_threads=1` in worker processes to avoid oversubscription when
+    the sweeps are parallelised.
+
+    Parameters
+    ----------
+    num_threads : int or None, default: 1
+        Maximum number of threads. If None: `os.cpu_count()`.
+
+    Returns
+    -------
+    previous : Dict[str, int]
+        Previous number of threads, keyed by library filepath, for the
+        libraries that could be set. To restore them afterwards, use the
+        `blas_threads` context manager instead.
+    """
+    if num_threads is None:
+        num_threads = os.cpu_count()
+    if num_threads < 1:
+        raise ValueError('num_threads must be positive, not {}.'
+                         .format(num_threads))
+    previous = {}
+    for lib in _libraries():
+        old = lib.get_num_threads()
+        if lib.set_num_threads(num_threads) and old is not None:
+            previous[lib.filepath] = old
+    return previous
+
+
+@contextmanager
+def blas_threads(num_threads: Optional[int] = 1):
+    """Set the number of BLAS/LAPACK threads during context.
+
+    Parameters
+    ----------
+    num_threads : int or None, default: 1
+        Maximum number of threads. If None: `os.cpu_count()`.
+
+    Example
+    -------
+    >>> with blas_threads(1):
+    >>>     generate_data(...)
+    """
+    previous = set_blas_threads(num_threads)
+    try:
+        yield
+    finally:
+        libs = {lib.filepath: lib for lib in _libraries()}
+        for filepath, old in previous.items():
+            libs[filepath].set_num_threads(old)
@@ -36,15 +36,17 @@ Copyright/licence info for that file:
 */
 
 /*              Table of Contents
-52.  Includes
-72.  Docstrings
-137. BLAS/Lapack calling functions
-165. Data rearrangement functions
-309. PDIST_RATIO and CDIST_RATIO
-554. NORM
-636. MATMUL
-780. Ufunc definition
-802. Module initialization stuff
+54.   Includes
+74.   Docstrings
+162.  BLAS/Lapack calling functions
+196.  Data rearrangement functions
+340.  PDIST_RATIO and CDIST_RATIO
+585.  NORM
+667.  MATMUL
+811.  GRAM
+950.  CROSS_GRAM
+1046. Ufunc definition
+1074. Module initialization stuff
 */
 
 /*
@@ -65,7 +67,7 @@ Copyright/licence info for that file:
 #include "gufunc_common.h"
 #include "gufunc_fortran.h"
 
-static const char* gufuncs_blas_version_string = "0.1.1";
+static const char* gufuncs_blas_version_string = "0.1.2";
 
 /*
 *****************************************************************************
@@ -132,6 +134,29 @@ PyDoc_STRVAR(norm__doc__,
 "Z: float\n"
 "    Euclidean norm of X.");
 
+PyDoc_STRVAR(gram__doc__,
+//"gram(X: ndarray) -> (Z: ndarray)\n\n"
+"Gram matrix of the columns of a matrix, `X.T @ X`.\n\n"
+"Uses a symmetric rank-k update, so only one triangle is computed.\n\n"
+"Parameters\n-----------\n"
+"X: ndarray (N,K)\n"
+"    Matrix whose columns we take inner products of.\n\n"
+"Returns\n-------\n"
+"Z: ndarray (K,K)\n"
+"    Symmetric matrix of inner products of columns.");
+
+PyDoc_STRVAR(cross_gram__doc__,
+//"cross_gram(X: ndarray, Y: ndarray) -> (Z: ndarray)\n\n"
+"Inner products of the columns of two matrices, `X.T @ Y`.\n\n"
+"Parameters\n-----------\n"
+"X: ndarray (N,K)\n"
+"    Matrix whose columns are on the left of the inner products.\n"
+"Y: ndarray (N,L)\n"
+"    Matrix whose columns are on the right of the inner products.\n\n"
+"Returns\n-------\n"
+"Z: ndarray (K,L)\n"
+"    Matrix of inner products of columns.");
+
 /*
 *****************************************************************************
 *                    BLAS/LAPACK calling macros                             *
@@ -160,6 +185,12 @@ FNAME(dgemm)(char *transa, char *transb, int *m, int *n, int *k,
     double *alpha, double *a, int *lda, double *b, int *ldb,
     double *beta, double *c, int *ldc);
 
+/* z -> a x'*x + b z, one triangle */
+extern int
+FNAME(dsyrk)(char *uplo, char *trans, int *n, int *k,
+    double *alpha, double *a, int *lda,
+    double *beta, double *c, int *ldc);
+
 /*
 *****************************************************************************
 **                   Data rearrangement functions                          **
@@ -775,6 +806,241 @@ INIT_OUTER_LOOP_3
     }
 }
 
+/*
+******************************************************************************
+**                                  GRAM                                    **
+******************************************************************************
+*/
+typedef struct syrk_params_struct
+{
+  void *A; /* A is scalar of base type */
+  void *B; /* B is scalar of base type */
+  void *X; /* X is (N,K) of base type */
+  void *Z; /* Z is (K,K) of base type */
+
+  fortran_int N;
+  fortran_int K;
+  fortran_int LDX;
+  fortran_int LDZ;
+  char UPLO;
+  char TRANS;
+} SYRK_PARAMS_t;
+
+/* **************************************
+* Calling BLAS/Lapack function _syrk
+***************************************** */
+
+static NPY_INLINE void
+call_dsyrk(SYRK_PARAMS_t *params)
+{
+    LAPACK(dsyrk)(&params->UPLO, &params->TRANS, &params->K, &params->N,
+       params->A, params->X, &params->LDX,
+       params->B, params->Z, &params->LDZ);
+}
+
+/* ******************************************************************
+* Initialize the parameters to use in for the lapack function _syrk
+* Handles buffer allocation
+********************************************************************* */
+
+static NPY_INLINE int
+init_DOUBLE_gram(SYRK_PARAMS_t *params, npy_intp N_in, npy_intp K_in)
+{
+    npy_uint8 *mem_buff = NULL;
+    npy_uint8 *a, *c;
+    fortran_int N = (fortran_int)N_in;
+    fortran_int K = (fortran_int)K_in;
+    size_t safe_N = N_in;
+    size_t safe_K = K_in;
+
+    mem_buff = malloc(safe_N * safe_K * sizeof(fortran_doublereal)
+                      + safe_K * safe_K * sizeof(fortran_doublereal));
+    if (!mem_buff) {
+        goto error;
+    }
+    a = mem_buff;
+    c = a + safe_N * safe_K * sizeof(fortran_doublereal);
+
+    params->UPLO = 'U';
+    params->TRANS = 'T';
+    params->A = &d_one;
+    params->B = &d_zero;
+    params->X = a;
+    params->Z = c;
+    params->N = N;
+    params->K = K;
+    params->LDX = fortran_int_max(N, 1);
+    params->LDZ = fortran_int_max(K, 1);
+
+    return 1;
+ error:
+    free(mem_buff);
+    memset(params, 0, sizeof(*params));
+    PyErr_NoMemory();
+
+    return 0;
+}
+
+/* *********************************
+* Deallocate buffer
+************************************* */
+
+static NPY_INLINE void
+release_DOUBLE_gram(SYRK_PARAMS_t *params)
+{
+    /* memory block base is in X */
+    free(params->X);
+    memset(params, 0, sizeof(*params));
+}
+
+/* *********************************
+* Copy upper triangle to lower
+************************************* */
+
+static NPY_INLINE void
+symmetrise_DOUBLE_triu(SYRK_PARAMS_t *params)
+{
+    double *z = (double *) params->Z;
+    fortran_int i, j;
+    // column-major: z[i,j] = z[i + j * LDZ]
+    for (j = 0; j < params->K; j++) {
+        for (i = 0; i < j; i++) {
+            z[j + i * params->LDZ] = z[i + j * params->LDZ];
+        }
+    }
+}
+
+/* ***************************
+* Inner GUfunc loop
+****************************** */
+
+static void
+DOUBLE_gram(char **args, npy_intp *dimensions, npy_intp *steps,
+              void *NPY_UNUSED(func))
+{
+INIT_OUTER_LOOP_2
+
+    npy_intp len_n = *dimensions++;  // rows of input
+    npy_intp len_k = *dimensions++;  // columns of input
+    npy_intp stride_x_n = *steps++;  // 1st arg
+    npy_intp stride_x_k = *steps++;
+    npy_intp stride_z_k1 = *steps++;  // output
+    npy_intp stride_z_k2 = *steps++;
+    SYRK_PARAMS_t params;
+    LINEARIZE_DATA_t x_in, z_out;
+
+    init_linearize_data(&x_in, len_k, len_n, stride_x_k, stride_x_n);
+    init_linearize_data(&z_out, len_k, len_k, stride_z_k2, stride_z_k1);
+
+    if(init_DOUBLE_gram(&params, len_n, len_k)) {
+        BEGIN_OUTER_LOOP_2
+
+            linearize_DOUBLE_matrix(params.X, args[0], &x_in);
+            call_dsyrk(&params);
+            symmetrise_DOUBLE_triu(&params);
+            delinearize_DOUBLE_matrix(args[1], params.Z, &z_out);
+
+        END_OUTER_LOOP_2
+        release_DOUBLE_gram(&params);
+    }
+}
+
+/*
+******************************************************************************
+**                               CROSS_GRAM                                 **
+******************************************************************************
+*/
+
+/* ******************************************************************
+* Initialize the parameters to use in for the lapack function _gemm
+* with the first factor transposed. Handles buffer allocation
+********************************************************************* */
+
+static NPY_INLINE int
+init_DOUBLE_xgram(GEMM_PARAMS_t *params, npy_intp N_in, npy_intp K_in,
+                  npy_intp L_in)
+{
+    npy_uint8 *mem_buff = NULL;
+    npy_uint8 *a, *b, *c;
+    fortran_int N = (fortran_int)N_in;
+    fortran_int K = (fortran_int)K_in;
+    fortran_int L = (fortran_int)L_in;
+    size_t safe_N = N_in;
+    size_t safe_K = K_in;
+    size_t safe_L = L_in;
+
+    mem_buff = malloc(safe_N * safe_K * sizeof(fortran_doublereal)
+                      + safe_N * safe_L * sizeof(fortran_doublereal)
+                      + safe_K * safe_L * sizeof(fortran_doublereal));
+    if (!mem_buff) {
+        goto error;
+    }
+    a = mem_buff;
+    b = a + safe_N * safe_K * sizeof(fortran_doublereal);
+    c = b + safe_N * safe_L * sizeof(fortran_doublereal);
+
+    params->TRANSX = 'T';
+    params->TRANSY = 'N';
+    params->A = &d_one;
+    params->B = &d_zero;
+    params->X = a;
+    params->Y = b;
+    params->Z = c;
+    params->M = K;
+    params->N = L;
+    params->K = N;
+    params->LDX = fortran_int_max(N, 1);
+    params->LDY = fortran_int_max(N, 1);
+    params->LDZ = fortran_int_max(K, 1);
+
+    return 1;
+ error:
+    free(mem_buff);
+    memset(params, 0, sizeof(*params));
+    PyErr_NoMemory();
+
+    return 0;
+}
+
+/* ***************************
+* Inner GUfunc loop
+****************************** */
+
+static void
+DOUBLE_cross_gram(char **args, npy_intp *dimensions, npy_intp *steps,
+              void *NPY_UNUSED(func))
+{
+INIT_OUTER_LOOP_3
+
+    npy_intp len_n = *dimensions++;  // rows of inputs
+    npy_intp len_k = *dimensions++;  // columns of left
+    npy_intp len_l = *dimensions++;  // columns of right
+    npy_intp stride_x_n = *steps++;  // 1st arg
+    npy_intp stride_x_k = *steps++;
+    npy_intp stride_y_n = *steps++;  // 2nd arg
+    npy_intp stride_y_l = *steps++;
+    npy_intp stride_z_k = *steps++;  // output
+    npy_intp stride_z_l = *steps++;
+    GEMM_PARAMS_t params;
+    LINEARIZE_DATA_t x_in, y_in, z_out;
+
+    init_linearize_data(&x_in, len_k, len_n, stride_x_k, stride_x_n);
+    init_linearize_data(&y_in, len_l, len_n, stride_y_l, stride_y_n);
+    init_linearize_data(&z_out, len_l, len_k, stride_z_l, stride_z_k);
+
+    if(init_DOUBLE_xgram(&params, len_n, len_k, len_l)) {
+        BEGIN_OUTER_LOOP_3
+
+            linearize_DOUBLE_matrix(params.X, args[0], &x_in);
+            linearize_DOUBLE_matrix(params.Y, args[1], &y_in);
+            call_dgemm(&params);
+            delinearize_DOUBLE_matrix(args[2], params.Z, &z_out);
+
+        END_OUTER_LOOP_3
+        release_DOUBLE_matm(&params);
+    }
+}
+
 /*
 *****************************************************************************
 **                             UFUNC DEFINITION                            **
@@ -785,6 +1051,8 @@ GUFUNC_FUNC_ARRAY_REAL(pdist_ratio);
 GUFUNC_FUNC_ARRAY_REAL(cdist_ratio);
 GUFUNC_FUNC_ARRAY_REAL(matmul);
 GUFUNC_FUNC_ARRAY_REAL(norm);
+GUFUNC_FUNC_ARRAY_REAL(gram);
+GUFUNC_FUNC_ARRAY_REAL(cross_gram);
 
 GUFUNC_DESCRIPTOR_t gufunc_descriptors[] = {
     {"pdist_ratio", "(d,m),(d,n)->(),()", pdist_ratio__doc__,
@@ -794,7 +1062,11 @@ GUFUNC_DESCRIPTOR_t gufunc_descriptors[] = {
     {"matmul", "(m,n),(n,p)->(m,p)", matmul__doc__,
      1, 2, 1, FUNC_ARRAY_NAME(matmul), ufn_types_1_3},
     {"norm", "(n)->()", norm__doc__,
-     1, 1, 1, FUNC_ARRAY_NAME(norm), ufn_types_1_2}
+     1, 1, 1, FUNC_ARRAY_NAME(norm), ufn_types_1_2},
+    {"gram", "(n,k)->(k,k)", gram__doc__,
+     1, 1, 1, FUNC_ARRAY_NAME(gram), ufn_types_1_2},
+    {"cross_gram", "(n,k),(n,l)->(k,l)", cross_gram__doc__,
+     1, 2, 1, FUNC_ARRAY_NAME(cross_gram), ufn_types_1_3}
 };
 
 /*
@@ -842,7 +1114,7 @@ PyObject *PyInit__gufuncs_blas(void)
     Py_DECREF(version);
 
     /* Load the ufunc operators into the module's namespace */
-    failure = addUfuncs(d, gufunc_descriptors, 4);
+    failure = addUfuncs(d, gufunc_descriptors, 6);
 
     if (PyErr_Occurred() || failure) {
         PyErr_SetString(PyExc_RuntimeError,
@@ -36,14 +36,17 @@ Copyright/licence info for that file:
 */
 
 /*              Table of Contents
-51.  Includes
-70.  Docstrings
-135. Structs used for array iteration
-171. PDIST_RATIO and CDIST_RATIO
-319. MATMUL
-377. NORM
-412. Ufunc definition
-434. Module initialization stuff
+53.  Includes
+72.  Docstrings
+190. Structs used for array iteration
+226. PDIST_RATIO and CDIST_RATIO
+374. MATMUL
+432. NORM
+464. VEC_DISTORT
+548. SMALL_EVALSH and SMALL_SVALSQ
+698. TRIU_CONGRUENCE
+770. Ufunc definition
+804. Module initialization stuff
 */
 
 /*
@@ -63,7 +66,7 @@ Copyright/licence info for that file:
 
 #include "gufunc_common.h"
 
-static const char* gufuncs_cloop_version_string = "0.1.1";
+static const char* gufuncs_cloop_version_string = "0.1.2";
 
 /*
 *****************************************************************************
@@ -130,6 +133,61 @@ PyDoc_STRVAR(norm__doc__,
 "Z: float\n"
 "    Euclidean norm of X.");
 
+PyDoc_STRVAR(vec_distort__doc__,
+//"vec_distort(X: ndarray, M: ndarray) -> (E: ndarray)\n\n"
+"Maximum distortion of vectors under projection onto their first `M` "
+"components, for several `M` at once.\n\n"
+"Computes `max_t |sqrt(N/M) ||X[t,:M]|| - 1|`, using running sums of squares "
+"so each vector is read only once, up to `max(M)`.\n\n"
+"Parameters\n-----------\n"
+"X: ndarray (...,T,N)\n"
+"    Set of vectors, each one a row. Maximum is taken over the `T` rows.\n"
+"M: ndarray (...,P)\n"
+"    Dimensionalities of projected space, `0 < M <= N`.\n\n"
+"Returns\n-------\n"
+"E: ndarray (...,P)\n"
+"    Maximum distortion of the rows of X for each M. NaN if M is invalid.");
+
+PyDoc_STRVAR(small_evalsh__doc__,
+//"small_evalsh(A: ndarray) -> (E: ndarray)\n\n"
+"Eigenvalues of small symmetric matrices, in closed form.\n\n"
+"Uses the quadratic formula for `K=2` and the trigonometric solution of the "
+"cubic for `K=3`. Off-diagonal elements are averaged with their transposes. "
+"For `K=3`, nearly degenerate eigenvalues are only accurate to about "
+"`sqrt(eps)` times their spread.\n\n"
+"Parameters\n-----------\n"
+"A: ndarray (...,K,K)\n"
+"    Symmetric matrix, or array of matrices, `K <= 3`.\n\n"
+"Returns\n-------\n"
+"E: ndarray (...,K)\n"
+"    Eigenvalues, in descending order. NaN if `K > 3`.");
+
+PyDoc_STRVAR(small_svalsq__doc__,
+//"small_svalsq(A: ndarray) -> (S: ndarray)\n\n"
+"Squared singular values of matrices with few columns, in closed form.\n\n"
+"Eigenvalues of the gram matrix `A.T @ A`, as in `small_evalsh`, with "
+"negative values from rounding set to zero.\n\n"
+"Parameters\n-----------\n"
+"A: ndarray (...,Q,K)\n"
+"    Matrix, or array of matrices, `K <= 3`.\n\n"
+"Returns\n-------\n"
+"S: ndarray (...,K)\n"
+"    Squared singular values, in descending order. NaN if `K > 3`.");
+
+PyDoc_STRVAR(triu_congruence__doc__,
+//"triu_congruence(H: ndarray, U: ndarray) -> (X: ndarray)\n\n"
+"Congruence transform of a matrix by the inverse of an upper triangular "
+"matrix, `U^-T H U^-1`, by forward and back substitution.\n\n"
+"Parameters\n-----------\n"
+"H: ndarray (...,K,K)\n"
+"    Matrix, or array of matrices, to transform.\n"
+"U: ndarray (...,K,K)\n"
+"    Upper triangular matrix, or array of matrices. The lower triangular "
+"part is not used.\n\n"
+"Returns\n-------\n"
+"X: ndarray (...,K,K)\n"
+"    Result of transform.");
+
 /*
 *****************************************************************************
 **               Structs used for array iteration                          **
@@ -405,6 +463,309 @@ INIT_OUTER_LOOP_2
     END_OUTER_LOOP_2
 }
 
+/* **********************************
+            VEC_DISTORT
+********************************** */
+// char *vec_distort_signature = "(t,n),(p)->(p)";
+
+static void
+DOUBLE_vec_distort(char **args, npy_intp *dimensions, npy_intp *steps,
+                   void *NPY_UNUSED(func))
+{
+INIT_OUTER_LOOP_3
+
+    npy_intp len_t = *dimensions++;  // number of vectors
+    npy_intp len_n = *dimensions++;  // ambient dimensions
+    npy_intp len_p = *dimensions++;  // number of projections
+    npy_intp stride_x_t = *steps++;  // 1st arg
+    npy_intp stride_x_n = *steps++;
+    npy_intp stride_m_p = *steps++;  // 2nd arg
+    npy_intp stride_e_p = *steps++;  // output
+    npy_intp t, n, p, len_m, max_m;
+    npy_double normsq, scale, eps;
+    npy_double *cum_sq;  // running sums of squares, cum_sq[n] = ||x[:n+1]||^2
+    int error_occurred = get_fp_invalid_and_clear();
+
+    cum_sq = malloc((len_n + 1) * sizeof(npy_double));
+    if (!cum_sq) {
+        PyErr_NoMemory();
+        return;
+    }
+
+    BEGIN_OUTER_LOOP_3
+
+        const char *ip_x = args[0];  //  1st arg
+        const char *ip_m = args[1];  //  2nd arg
+        char *op_e = args[2];        //  output
+
+        // largest valid M: no need to read any further along vectors
+        max_m = 0;
+        for (p = 0; p < len_p; p++) {
+            len_m = (npy_intp)(*(npy_double *)ip_m);
+            if (len_m > max_m && len_m <= len_n) max_m = len_m;
+            *(npy_double *)op_e = d_zero;  // running max
+            ip_m += stride_m_p;
+            op_e += stride_e_p;
+        }
+        ip_m -= len_p * stride_m_p;
+        op_e -= len_p * stride_e_p;
+
+        for (t = 0; t < len_t; t++) {
+            normsq = d_zero;
+            for (n = 0; n < max_m; n++) {
+                normsq += *(npy_double *)ip_x * *(npy_double *)ip_x;
+                cum_sq[n] = normsq;
+                ip_x += stride_x_n;
+            }
+            ip_x -= max_m * stride_x_n;
+
+            for (p = 0; p < len_p; p++) {
+                len_m = (npy_intp)(*(npy_double *)ip_m);
+                if (len_m < 1 || len_m > len_n) {
+                    error_occurred = 1;
+                    *(npy_double *)op_e = d_nan;
+                } else {
+                    scale = (npy_double)len_n / (npy_double)len_m;
+                    eps = npy_fabs(npy_sqrt(scale * cum_sq[len_m - 1]) - d_one);
+                    // update running max
+                    if (eps > *(npy_double *)op_e) *(npy_double *)op_e = eps;
+                }
+                ip_m += stride_m_p;
+                op_e += stride_e_p;
+            }
+            ip_m -= len_p * stride_m_p;
+            op_e -= len_p * stride_e_p;
+
+            ip_x += stride_x_t;
+        }
+
+    END_OUTER_LOOP_3
+
+    free(cum_sq);
+    set_fp_invalid_or_clear(error_occurred);
+}
+
+
+
+/* **********************************
+    SMALL_EVALSH and SMALL_SVALSQ
+********************************** */
+
+/* Eigenvalues of symmetric matrix with K <= 3, in descending order.
+   Only the upper triangle of sym is used. Returns 1 if K > 3. */
+static int
+DOUBLE_small_eig(npy_double sym[3][3], npy_double *evals, npy_intp len_k)
+{
+    npy_double mean, half_diff, disc, off_sq, b00, b11, b22, p, r, phi;
+    switch (len_k) {
+    case 1:
+        evals[0] = sym[0][0];
+        return 0;
+    case 2:
+        mean = (sym[0][0] + sym[1][1]) / 2;
+        half_diff = (sym[0][0] - sym[1][1]) / 2;
+        disc = npy_hypot(half_diff, sym[0][1]);
+        evals[0] = mean + disc;
+        evals[1] = mean - disc;
+        return 0;
+    case 3:
+        // shift by mean, B = (A - mean I) / p, eigenvalues 2 cos(phi + ...)
+        mean = (sym[0][0] + sym[1][1] + sym[2][2]) / 3;
+        b00 = sym[0][0] - mean;
+        b11 = sym[1][1] - mean;
+        b22 = sym[2][2] - mean;
+        off_sq = (sym[0][1] * sym[0][1] + sym[0][2] * sym[0][2]
+                  + sym[1][2] * sym[1][2]);
+        p = npy_sqrt((b00 * b00 + b11 * b11 + b22 * b22 + 2 * off_sq) / 6);
+        if (p == d_zero) {
+            evals[0] = evals[1] = evals[2] = mean;
+            return 0;
+        }
+        // det(B) / 2
+        r = (b00 * (b11 * b22 - sym[1][2] * sym[1][2])
+             - sym[0][1] * (sym[0][1] * b22 - sym[1][2] * sym[0][2])
+             + sym[0][2] * (sym[0][1] * sym[1][2] - b11 * sym[0][2]))
+            / (2 * p * p * p);
+        if (r > d_one) r = d_one;
+        if (r < d_minus_one) r = d_minus_one;
+        phi = npy_acos(r) / 3;
+        evals[0] = mean + 2 * p * npy_cos(phi);
+        evals[2] = mean + 2 * p * npy_cos(phi + 2 * NPY_PI / 3);
+        evals[1] = 3 * mean - evals[0] - evals[2];
+        return 0;
+    default:
+        evals[0] = d_nan;
+        return 1;
+    }
+}
+
+// char *small_evalsh_signature = "(k,k)->(k)";
+
+static void
+DOUBLE_small_evalsh(char **args, npy_intp *dimensions, npy_intp *steps,
+                    void *NPY_UNUSED(func))
+{
+INIT_OUTER_LOOP_2
+
+    npy_intp len_k = *dimensions++;  // dimensions of matrix
+    npy_intp stride_a_r = *steps++;  // 1st arg
+    npy_intp stride_a_c = *steps++;
+    npy_intp stride_e_k = *steps++;  // output
+    npy_intp a, b;
+    npy_double sym[3][3], evals[3];
+    int error_occurred = get_fp_invalid_and_clear();
+
+    BEGIN_OUTER_LOOP_2
+
+        const char *ip_a = args[0];  //  1st arg
+        char *op_e = args[1];        //  output
+
+        if (len_k <= 3) {
+            for (a = 0; a < len_k; a++) {
+                for (b = a; b < len_k; b++) {
+                    sym[a][b] = (*(npy_double *)(ip_a + a * stride_a_r + b * stride_a_c)
+                                 + *(npy_double *)(ip_a + b * stride_a_r + a * stride_a_c)) / 2;
+                }
+            }
+        }
+        if (DOUBLE_small_eig(sym, evals, len_k)) {
+            error_occurred = 1;
+            for (a = 0; a < len_k; a++) evals[a % 3] = d_nan;
+        }
+        for (a = 0; a < len_k; a++) {
+            *(npy_double *)op_e = evals[a % 3];
+            op_e += stride_e_k;
+        }
+
+    END_OUTER_LOOP_2
+
+    set_fp_invalid_or_clear(error_occurred);
+}
+
+// char *small_svalsq_signature = "(q,k)->(k)";
+
+static void
+DOUBLE_small_svalsq(char **args, npy_intp *dimensions, npy_intp *steps,
+                    void *NPY_UNUSED(func))
+{
+INIT_OUTER_LOOP_2
+
+    npy_intp len_q = *dimensions++;  // rows of matrix
+    npy_intp len_k = *dimensions++;  // columns of matrix
+    npy_intp stride_a_q = *steps++;  // 1st arg
+    npy_intp stride_a_k = *steps++;
+    npy_intp stride_s_k = *steps++;  // output
+    npy_intp q, a, b;
+    npy_double sym[3][3], evals[3];
+    int error_occurred = get_fp_invalid_and_clear();
+
+    BEGIN_OUTER_LOOP_2
+
+        const char *ip_a = args[0];  //  1st arg
+        char *op_s = args[1];        //  output
+
+        if (len_k <= 3) {
+            // upper triangle of gram matrix
+            for (a = 0; a < len_k; a++) {
+                for (b = a; b < len_k; b++) {
+                    sym[a][b] = d_zero;
+                }
+            }
+            for (q = 0; q < len_q; q++) {
+                for (a = 0; a < len_k; a++) {
+                    for (b = a; b < len_k; b++) {
+                        sym[a][b] += (*(npy_double *)(ip_a + a * stride_a_k)
+                                      * *(npy_double *)(ip_a + b * stride_a_k));
+                    }
+                }
+                ip_a += stride_a_q;
+            }
+        }
+        if (DOUBLE_small_eig(sym, evals, len_k)) {
+            error_occurred = 1;
+            for (a = 0; a < len_k; a++) evals[a % 3] = d_nan;
+        }
+        for (a = 0; a < len_k; a++) {
+            // gram matrix is positive semi-definite, up to rounding
+            if (evals[a % 3] < d_zero) evals[a % 3] = d_zero;
+            *(npy_double *)op_s = evals[a % 3];
+            op_s += stride_s_k;
+        }
+
+    END_OUTER_LOOP_2
+
+    set_fp_invalid_or_clear(error_occurred);
+}
+
+/* **********************************
+            TRIU_CONGRUENCE
+********************************** */
+// char *triu_congruence_signature = "(k,k),(k,k)->(k,k)";
+
+static void
+DOUBLE_triu_congruence(char **args, npy_intp *dimensions, npy_intp *steps,
+                       void *NPY_UNUSED(func))
+{
+INIT_OUTER_LOOP_3
+
+    npy_intp len_k = *dimensions++;  // dimensions of matrices
+    npy_intp stride_h_r = *steps++;  // 1st arg
+    npy_intp stride_h_c = *steps++;
+    npy_intp stride_u_r = *steps++;  // 2nd arg
+    npy_intp stride_u_c = *steps++;
+    npy_intp stride_x_r = *steps++;  // output
+    npy_intp stride_x_c = *steps++;
+    npy_intp a, b, c;
+    npy_double *work, *hess, *utri, val;
+
+    // work[a,b] = (U^-T H)[a,b], hess[a,b] = H[a,b], utri[a,b] = U[a,b]
+    work = malloc(3 * len_k * len_k * sizeof(npy_double));
+    if (!work) {
+        PyErr_NoMemory();
+        return;
+    }
+    hess = work + len_k * len_k;
+    utri = hess + len_k * len_k;
+
+    BEGIN_OUTER_LOOP_3
+
+        const char *ip_h = args[0];  //  1st arg
+        const char *ip_u = args[1];  //  2nd arg
+        char *op_x = args[2];        //  output
+
+        for (a = 0; a < len_k; a++) {
+            for (b = 0; b < len_k; b++) {
+                hess[a * len_k + b] = *(npy_double *)(ip_h + a * stride_h_r + b * stride_h_c);
+                utri[a * len_k + b] = *(npy_double *)(ip_u + a * stride_u_r + b * stride_u_c);
+            }
+        }
+        // forward substitution, U^T W = H, one column of H at a time
+        for (b = 0; b < len_k; b++) {
+            for (a = 0; a < len_k; a++) {
+                val = hess[a * len_k + b];
+                for (c = 0; c < a; c++) {
+                    val -= utri[c * len_k + a] * work[c * len_k + b];
+                }
+                work[a * len_k + b] = val / utri[a * len_k + a];
+            }
+        }
+        // back substitution, X U = W, one row of W at a time, in place
+        for (a = 0; a < len_k; a++) {
+            for (b = 0; b < len_k; b++) {
+                val = work[a * len_k + b];
+                for (c = 0; c < b; c++) {
+                    val -= work[a * len_k + c] * utri[c * len_k + b];
+                }
+                work[a * len_k + b] = val / utri[b * len_k + b];
+                *(npy_double *)(op_x + a * stride_x_r + b * stride_x_c) = work[a * len_k + b];
+            }
+        }
+
+    END_OUTER_LOOP_3
+
+    free(work);
+}
+
 
 
 /*
@@ -417,6 +778,10 @@ GUFUNC_FUNC_ARRAY_REAL(pdist_ratio);
 GUFUNC_FUNC_ARRAY_REAL(cdist_ratio);
 GUFUNC_FUNC_ARRAY_REAL(matmul);
 GUFUNC_FUNC_ARRAY_REAL(norm);
+GUFUNC_FUNC_ARRAY_REAL(vec_distort);
+GUFUNC_FUNC_ARRAY_REAL(small_evalsh);
+GUFUNC_FUNC_ARRAY_REAL(small_svalsq);
+GUFUNC_FUNC_ARRAY_REAL(triu_congruence);
 
 GUFUNC_DESCRIPTOR_t gufunc_descriptors[] = {
     {"pdist_ratio", "(d,m),(d,n)->(),()", pdist_ratio__doc__,
@@ -426,7 +791,15 @@ GUFUNC_DESCRIPTOR_t gufunc_descriptors[] = {
     {"matmul", "(m,n),(n,p)->(m,p)", matmul__doc__,
      1, 2, 1, FUNC_ARRAY_NAME(matmul), ufn_types_1_3},
     {"norm", "(n)->()", norm__doc__,
-     1, 1, 1, FUNC_ARRAY_NAME(norm), ufn_types_1_2}
+     1, 1, 1, FUNC_ARRAY_NAME(norm), ufn_types_1_2},
+    {"vec_distort", "(t,n),(p)->(p)", vec_distort__doc__,
+     1, 2, 1, FUNC_ARRAY_NAME(vec_distort), ufn_types_1_3},
+    {"small_evalsh", "(k,k)->(k)", small_evalsh__doc__,
+     1, 1, 1, FUNC_ARRAY_NAME(small_evalsh), ufn_types_1_2},
+    {"small_svalsq", "(q,k)->(k)", small_svalsq__doc__,
+     1, 1, 1, FUNC_ARRAY_NAME(small_svalsq), ufn_types_1_2},
+    {"triu_congruence", "(k,k),(k,k)->(k,k)", triu_congruence__doc__,
+     1, 2, 1, FUNC_ARRAY_NAME(triu_congruence), ufn_types_1_3}
 };
 
 /*
@@ -474,7 +847,7 @@ PyObject *PyInit__gufuncs_cloop(void)
     Py_DECREF(version);
 
     /* Load the ufunc operators into the module's namespace */
-    failure = addUfuncs(d, gufunc_descriptors, 4);
+    failure = addUfuncs(d, gufunc_descriptors, 8);
 
     if (PyErr_Occurred() || failure) {
         PyErr_SetString(PyExc_RuntimeError,
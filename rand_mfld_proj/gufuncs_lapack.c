@@ -154,6 +154,23 @@ PyDoc_STRVAR(singvals__doc__,
 "S: ndarray (...,K)\n"
 "    Vector of singular values. `K = min(M,N)`\n");
 
+PyDoc_STRVAR(mat_distort__doc__,
+//"mat_distort(A: ndarray, M: ndarray) -> (E: ndarray)\n\n"
+"Maximum distortion of subspaces under projection onto their first `M` "
+"components, for several `M` at once.\n\n"
+"Computes `max_{t,k} |sqrt(N/M) s_k(A[t,:M,:]) - 1|`, where `s_k` are the "
+"singular values, from the eigenvalues of running sums of `a a'` over the "
+"rows `a` of `A[t]`, so each matrix is read only once, up to `max(M)`.\n\n"
+"Parameters\n-----------\n"
+"A: ndarray (...,T,N,K)\n"
+"    Set of orthonormal bases, each one `N x K`. "
+"Maximum is taken over the `T` bases.\n"
+"M: ndarray (...,P)\n"
+"    Dimensionalities of projected space, `0 < M <= N`.\n\n"
+"Returns\n-------\n"
+"E: ndarray (...,P)\n"
+"    Maximum distortion of the subspaces for each M. NaN if M is invalid.");
+
 /*
 *****************************************************************************
 **                   BLAS/LAPACK calling macros                            **
@@ -1267,7 +1284,7 @@ init_dgesdd(GESDD_PARAMS_t *params, npy_intp M_in, npy_intp N_in)
     size_t safe_MN = MN;
     fortran_int lda = fortran_int_max(M, 1);
     fortran_doublereal work_size;
-    fortran_int iwork_size;
+    fortran_int iwork_query; /* not set by the workspace query */
     mem_buff = malloc(safe_M * safe_N * sizeof(fortran_doublereal)
                     + safe_MN * sizeof(fortran_doublereal));
     if (!mem_buff) {
@@ -1281,7 +1298,7 @@ init_dgesdd(GESDD_PARAMS_t *params, npy_intp M_in, npy_intp N_in)
     params->U = NULL; // unused
     params->V = NULL; // unused
     params->W = &work_size;
-    params->IW = &iwork_size;
+    params->IW = &iwork_query;
     params->M = M;
     params->N = N;
     params->LDA = lda;
@@ -1297,7 +1314,7 @@ init_dgesdd(GESDD_PARAMS_t *params, npy_intp M_in, npy_intp N_in)
     }
     fortran_int LW = (fortran_int)work_size;
     size_t safe_LW = LW;
-    fortran_int LIW = iwork_size;
+    fortran_int LIW = 8 * MN;  /* gesdd does not report an iwork size */
     size_t safe_LIW = LIW;
 
     mem_buff2 = malloc(safe_LW * sizeof(fortran_doublereal)
@@ -1306,7 +1323,7 @@ init_dgesdd(GESDD_PARAMS_t *params, npy_intp M_in, npy_intp N_in)
         goto error;
     }
     c = mem_buff2;
-    d = a + safe_LW * sizeof(fortran_doublereal);
+    d = c + safe_LW * sizeof(fortran_doublereal);
 
     params->W = c;
     params->IW = (fortran_int*)d;
@@ -1377,6 +1394,119 @@ INIT_OUTER_LOOP_2
     set_fp_invalid_or_clear(error_occurred);
 }
 
+/*
+******************************************************************************
+**                             MAT_DISTORT                                  **
+******************************************************************************
+*/
+
+// char *mat_distort_signature = "(t,n,k),(p)->(p)";
+
+static void
+DOUBLE_mat_distort(char **args, npy_intp *dimensions, npy_intp *steps,
+                   void *NPY_UNUSED(func))
+{
+INIT_OUTER_LOOP_3
+    npy_intp len_t = *dimensions++;  // number of bases
+    npy_intp len_n = *dimensions++;  // ambient dimensions
+    npy_intp len_k = *dimensions++;  // subspace dimensions
+    npy_intp len_p = *dimensions++;  // number of projections
+    npy_intp stride_a_t = *steps++;  // 1st arg
+    npy_intp stride_a_n = *steps++;
+    npy_intp stride_a_k = *steps++;
+    npy_intp stride_m_p = *steps++;  // 2nd arg
+    npy_intp stride_e_p = *steps++;  // output
+    npy_intp t, n, i, j, p, len_m, max_m;
+    npy_double scale, eps, sval, *gram, *row;
+    int error_occurred = get_fp_invalid_and_clear();
+    SYEV_PARAMS_t params;
+
+    // running sum of a a' (upper triangle, fortran order) and current row a
+    gram = malloc((len_k * len_k + len_k) * sizeof(npy_double));
+    if (!gram) {
+        PyErr_NoMemory();
+        return;
+    }
+    row = gram + len_k * len_k;
+    if (!init_dsyev(&params, len_k)) {
+        free(gram);
+        PyErr_NoMemory();
+        return;
+    }
+
+    BEGIN_OUTER_LOOP_3
+
+        const char *ip_a = args[0];  //  1st arg
+        const char *ip_m = args[1];  //  2nd arg
+        char *op_e = args[2];        //  output
+
+        // largest valid M: no need to read any further along bases
+        max_m = 0;
+        for (p = 0; p < len_p; p++) {
+            len_m = (npy_intp)(*(npy_double *)ip_m);
+            if (len_m > max_m && len_m <= len_n) max_m = len_m;
+            if (len_m < 1 || len_m > len_n) {
+                error_occurred = 1;
+                *(npy_double *)op_e = d_nan;
+            } else {
+                *(npy_double *)op_e = d_zero;  // running max
+            }
+            ip_m += stride_m_p;
+            op_e += stride_e_p;
+        }
+        ip_m -= len_p * stride_m_p;
+        op_e -= len_p * stride_e_p;
+
+        for (t = 0; t < len_t; t++) {
+            const char *ip_r = ip_a;
+            memset(gram, 0, len_k * len_k * sizeof(npy_double));
+            for (n = 0; n < max_m; n++) {
+                for (j = 0; j < len_k; j++) {
+                    row[j] = *(npy_double *)(ip_r + j * stride_a_k);
+                }
+                for (j = 0; j < len_k; j++) {
+                    for (i = 0; i <= j; i++) {
+                        gram[i + j * len_k] += row[i] * row[j];
+                    }
+                }
+                ip_r += stride_a_n;
+
+                // singular values for each M == n + 1
+                for (p = 0; p < len_p; p++) {
+                    len_m = (npy_intp)(*(npy_double *)(ip_m + p * stride_m_p));
+                    if (len_m != n + 1) continue;
+                    memcpy(params.A, gram,
+                           len_k * len_k * sizeof(npy_double));
+                    call_dsyev(&params);
+                    if (params.INFO) {
+                        error_occurred = 1;
+                        *(npy_double *)(op_e + p * stride_e_p) = d_nan;
+                        continue;
+                    }
+                    scale = npy_sqrt((npy_double)len_n / (npy_double)len_m);
+                    // ascending, if M < K the first K - M are not singvals
+                    i = len_m < len_k ? len_k - len_m : 0;
+                    for (j = i; j < len_k; j++) {
+                        sval = ((npy_double *)params.EVAL)[j];
+                        sval = sval > d_zero ? npy_sqrt(sval) : d_zero;
+                        eps = npy_fabs(scale * sval - d_one);
+                        // update running max, NaN stays NaN
+                        if (eps > *(npy_double *)(op_e + p * stride_e_p)) {
+                            *(npy_double *)(op_e + p * stride_e_p) = eps;
+                        }
+                    }
+                }
+            }
+            ip_a += stride_a_t;
+        }
+
+    END_OUTER_LOOP_3
+
+    release_dsyev(&params);
+    free(gram);
+    set_fp_invalid_or_clear(error_occurred);
+}
+
 /*
 *****************************************************************************
 **                             Ufunc definition                            **
@@ -1390,6 +1520,7 @@ GUFUNC_FUNC_ARRAY_REAL(tril_solve);
 GUFUNC_FUNC_ARRAY_REAL(rtriu_solve);
 GUFUNC_FUNC_ARRAY_REAL(eigvalsh);
 GUFUNC_FUNC_ARRAY_REAL(singvals);
+GUFUNC_FUNC_ARRAY_REAL(mat_distort);
 
 GUFUNC_DESCRIPTOR_t gufunc_descriptors[] = {
     {"qr", "(m,n)->(m,n)", qr__doc__,
@@ -1405,7 +1536,9 @@ GUFUNC_DESCRIPTOR_t gufunc_descriptors[] = {
     {"eigvalsh", "(n,n)->(n)", eigvalsh__doc__,
      1, 1, 1, FUNC_ARRAY_NAME(eigvalsh), ufn_types_1_2},
     {"singvals", "(m,n)->(n)", singvals__doc__,
-     1, 1, 1, FUNC_ARRAY_NAME(singvals), ufn_types_1_2}
+     1, 1, 1, FUNC_ARRAY_NAME(singvals), ufn_types_1_2},
+    {"mat_distort", "(t,n,k),(p)->(p)", mat_distort__doc__,
+     1, 2, 1, FUNC_ARRAY_NAME(mat_distort), ufn_types_1_3}
 };
 
 /*
@@ -1453,7 +1586,7 @@ PyObject *PyInit__gufuncs_lapack(void)
     Py_DECREF(version);
 
     /* Load the ufunc operators into the module's namespace */
-    failure = addUfuncs(d, gufunc_descriptors, 7);
+    failure = addUfuncs(d, gufunc_descriptors, 8);
 
     if (PyErr_Occurred() || failure) {
         PyErr_SetString(PyExc_RuntimeError,
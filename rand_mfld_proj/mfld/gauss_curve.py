@@ -32,7 +32,7 @@ default_options_plot
 make_and_plot
     generate data and plot figures
 """
-from typing import Sequence
+from typing import Optional, Sequence
 import numpy as np
 from numpy import ndarray as array
 from . import gauss_mfld as gm
@@ -49,7 +49,9 @@ def get_all_numeric(ambient_dim: int,
                     intrinsic_range: float,
                     intrinsic_num: int,
                     width: float = 1.,
-                    expand: int = 2) -> (array, array, array, array):
+                    expand: int = 2,
+                    generator: Optional[gm.ManifoldGenerator] = None
+                    ) -> (array, array, array, array):
     """calculate everything
 
     Calculate everything
@@ -77,9 +79,13 @@ def get_all_numeric(ambient_dim: int,
         std dev of gaussian covariance. Default=1.0
     expand
         factor to increase size by, to subsample later, must be even
+    generator
+        reused to draw the curve, when calling repeatedly with the same
+        parameters, see `gauss_mfld.ManifoldGenerator`.
     """
     return gm.get_all_numeric(ambient_dim, (intrinsic_range,),
-                              (intrinsic_num,), (width,), expand)
+                              (intrinsic_num,), (width,), expand,
+                              generator=generator)
 
 
 def get_all_analytic(ambient_dim: int,
@@ -200,15 +206,20 @@ def make_and_plot(num_trials: int,
     thr = get_all_analytic(ambient_dim,
                            intrinsic_range,
                            intrinsic_num)
+    # spatial frequencies, covariance, etc. shared by all trials
+    generator = gm.ManifoldGenerator(ambient_dim, (intrinsic_range,),
+                                     (intrinsic_num,), (1.,))
     num = get_all_numeric(ambient_dim,
                           intrinsic_range,
-                          intrinsic_num)
+                          intrinsic_num,
+                          generator=generator)
 
     gcp.plot_theory_all(axs, thr[0], thr[1:], num,
                         xlabs, ylabs, leglocs, txtopts, legopts)
 
     for i in dcount('trial', num_trials):
-        num = get_all_numeric(ambient_dim, intrinsic_range, intrinsic_num)
+        num = get_all_numeric(ambient_dim, intrinsic_range, intrinsic_num,
+                              generator=generator)
         gcp.plot_num_all(axs, thr[0], num)
 
     axs[3].set_ylim(bottom=0.0)
@@ -10,10 +10,16 @@ dimensional space
 
 Functions
 =========
+ManifoldGenerator
+    repeated draws of random manifolds with the same parameters
 numeric_distance
     numeric distance between points on manifold
 numeric_sines
     numeric angles between tangent planes to manifold
+numeric_distance_all
+    numeric distance, averaged over all points on manifold as centres
+numeric_sines_centres
+    numeric angles between tangent planes, averaged over many centres
 numeric_proj
     numeric angles between chords and tangent planes to manifold
 numeric_curv
@@ -27,12 +33,14 @@ quick_options
 make_and_save
     generate data and save npz file
 """
-from typing import Sequence, Tuple, Optional
+from typing import Dict, Optional, Sequence, Set, Tuple
 import numpy as np
 from . import gauss_mfld_theory as gmt
-from ..iter_tricks import dcontext, dndindex
+from ..iter_tricks import dcontext, dbatch
 from ..myarray import (array, wrap_one, norm, qr_c, eigvalsh, singvals,
-                       tril_solve, rtriu_solve)
+                       tril_solve, rtriu_solve, gram, cross_gram,
+                       small_evalsh, small_svalsq, triu_congruence,
+                       mt, uncol)
 
 # =============================================================================
 # generate surface
@@ -99,7 +107,7 @@ def gauss_sqrt_cov_ft(karr: array, width: float = 1.0) -> array:
     dk = np.prod([np.diff(karr, axis=i).max() for i in range(K)])  # k-cell vol
     ksq = np.sum((width * karr)**2, axis=-1)
     # scaled to convert continuum FT to DFT
-    cov_ft = (dk * np.prod(width) / np.sqrt(2 * np.pi)) * np.exp(-0.5 * ksq)
+    cov_ft = (dk * np.prod(width) / (2 * np.pi)**(K / 2)) * np.exp(-0.5 * ksq)
     return num_pt * np.sqrt(cov_ft)
 
 
@@ -129,19 +137,129 @@ def random_embed_ft(num_dim: int,
     """
     sqrt_cov = gauss_sqrt_cov_ft(karr, np.array(width))
     siz = karr.shape[:-2] + (num_dim,)
-    emb_ft_r = np.random.randn(*siz)
-    emb_ft_i = np.random.randn(*siz)
+    emb_ft = hermitian_noise(siz, *hermitian_inds(siz))
+    emb_ft *= sqrt_cov / np.sqrt(2 * num_dim)
+    return emb_ft
 
+
+def hermitian_inds(siz: Sequence[int]) -> (Tuple[array, ...],
+                                           Tuple[array, ...]):
+    """
+    Indices for making the first slice of an rfftn Hermitian
+
+    Returns
+    -------
+    flipinds
+        `np.ix_` indices of the mirror image of the first slice, k -> -k.
+    repinds
+        `np.ix_` indices of the real elements of the first slice, k = -k.
+
+    Parameters
+    ----------
+    siz
+        shape of Fourier transform, (L1,L2,...,LK/2+1,N)
+    """
     flipinds = tuple(-np.arange(k) for k in siz[:-2]) + (np.array([0]),)
     repinds = tuple(np.array([0, k//2]) for k in siz[:-2]) + (np.array([0]),)
+    return np.ix_(*flipinds), np.ix_(*repinds)
 
-    emb_ft_r[..., :1, :] += emb_ft_r[np.ix_(*flipinds)]
-    emb_ft_r[..., :1, :] /= np.sqrt(2)
-    emb_ft_r[np.ix_(*repinds)] /= np.sqrt(2)
-    emb_ft_i[..., :1, :] -= emb_ft_i[np.ix_(*flipinds)]
-    emb_ft_i[..., :1, :] /= np.sqrt(2)
 
-    return (emb_ft_r + 1j * emb_ft_i) * sqrt_cov / np.sqrt(2 * num_dim)
+def hermitian_noise(siz: Sequence[int],
+                    flipinds: Tuple[array, ...],
+                    repinds: Tuple[array, ...]) -> array:
+    """
+    White noise in Fourier space, for the rfftn of real noise
+
+    Returns
+    -------
+    noise (L1,L2,...,LK/2+1,N)
+        complex Gaussian, with real and imaginary parts of variance 1,
+        except in the first slice, which is Hermitian.
+
+    Parameters
+    ----------
+    siz
+        shape of Fourier transform, (L1,L2,...,LK/2+1,N)
+    flipinds, repinds
+        indices from `hermitian_inds`
+    """
+    noise = np.empty(siz, complex)
+    noise.real = np.random.randn(*siz)
+    noise.imag = np.random.randn(*siz)
+    # real part += flipped, imaginary part -= flipped
+    noise[..., :1, :] += noise[flipinds].conj()
+    noise[..., :1, :] /= np.sqrt(2)
+    noise.real[repinds] /= np.sqrt(2)
+    return noise
+
+
+class ManifoldGenerator():
+    """
+    Independent draws of random Gaussian manifolds on the same grid
+
+    Everything that does not depend on the draw is computed once: the
+    spatial frequencies, the square root of the covariance and the indices
+    for the Hermitian symmetry. Each draw only needs random numbers, and the
+    Fourier transforms done by the `SubmanifoldFTbundle` it returns.
+
+    Parameters
+    ----------
+    ambient_dim
+        N, dimensionality of ambient space
+    intrinsic_range
+        tuple of ranges of intrinsic coords [-intrinsic_range, intrinsic_range]
+    intrinsic_num
+        tuple of numbers of sampling points on surface
+    width
+        tuple of std devs of gaussian covariance along each intrinsic axis
+    expand
+        factor to increase size by, to subsample later
+    """
+    ambient: int
+    karr: array
+    sqrt_cov: array
+    siz: Tuple[int, ...]
+    flipinds: Tuple[array, ...]
+    repinds: Tuple[array, ...]
+
+    def __init__(self,
+                 ambient_dim: int,
+                 intrinsic_range: Sequence[float],
+                 intrinsic_num: Sequence[int],
+                 width: Sequence[float] = (1.0, 1.0),
+                 expand: int = 2):
+        self.ambient = ambient_dim
+        self.karr = spatial_freq(intrinsic_range, intrinsic_num, expand)
+        self.sqrt_cov = (gauss_sqrt_cov_ft(self.karr, np.array(width))
+                         / np.sqrt(2 * ambient_dim))
+        self.siz = self.karr.shape[:-2] + (ambient_dim,)
+        self.flipinds, self.repinds = hermitian_inds(self.siz)
+
+    def embed_ft(self) -> array:
+        """
+        Draw Fourier transform of embedding functions, as `random_embed_ft`
+
+        Returns
+        -------
+        embed_ft
+            Fourier transform of embedding functions,
+            embed_ft[s,t,...,i] = phi^i(k1[s], k2[t], ...)
+        """
+        emb_ft = hermitian_noise(self.siz, self.flipinds, self.repinds)
+        emb_ft *= self.sqrt_cov
+        return emb_ft.view(array)
+
+    def draw(self) -> 'SubmanifoldFTbundle':
+        """
+        Draw a random manifold
+
+        Returns
+        -------
+        mfld
+            `SubmanifoldFTbundle` with `ft` and `k` stored. The spatial
+            frequencies `k` are shared by all draws.
+        """
+        return SubmanifoldFTbundle(self.embed_ft(), self.karr)
 
 
 # =============================================================================
@@ -149,6 +267,35 @@ def random_embed_ft(num_dim: int,
 # =============================================================================
 
 
+# fields needed to compute each field
+_DEPENDS = {'ft': (), 'k': (),
+            'mfld': ('ft', 'k'), 'grad': ('ft', 'k'), 'hess': ('ft', 'k'),
+            'gmap': ('grad',), 'vbeini': ('grad',)}
+# method that computes each field
+_CALC = {'mfld': 'calc_embed', 'grad': 'calc_grad', 'hess': 'calc_hess',
+         'gmap': 'calc_gmap', 'vbeini': 'calc_gmap'}
+
+
+class _Field():
+    """Field of `SubmanifoldFTbundle`, computed on first access if possible.
+
+    Reading gives the stored array. If there is none, it is computed from the
+    fields it depends on, if they are available, else it is None.
+    """
+    name: str
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj._get(self.name)
+
+    def __set__(self, obj, value: Optional[array]):
+        obj._set(self.name, value)
+
+
 class SubmanifoldFTbundle():
     """Class describing a submanifold of R^N and its tangent bundle
 
@@ -167,22 +314,35 @@ class SubmanifoldFTbundle():
         orthonormal basis for extrinsic tangent space, (Lx,Ly,N,K)
         gmap[s,t,i,A] = e_A^i(x[s], y[t]).
         e_(A=0)^i must be parallel to d(phi^i)/dx^(a=0)
+
+    Fields are computed when first read, from `ft` and `k`, and cached. The
+    `calc_*` methods compute them explicitly. Declaring the fields that will
+    be used with `request` lets intermediates be freed as soon as everything
+    that needs them has been computed, and `release` frees the requested
+    fields after their last use.
     """
-    ft: Optional[array]  # Fourier transform of embedding, (L1,...,N)
-    k: Optional[array]  # Spatial frequencies, (L1,...,K)
-    mfld: Optional[array]  # Embedding funrction, (L1,...,N)
-    grad: Optional[array]  # Gradient of embedding, (L1,...,N,K)
-    hess: Optional[array]  # Hessian of embedding, (L1,...,N,K,K)
-    gmap: Optional[array]  # Gauss map of embedding, (L1,...,N,K)
-    vbeini: Optional[array]  # Inverse vielbein of manifold, (L1,...,K,K)[_a^A]
+    ft = _Field()  # Fourier transform of embedding, (L1,...,N)
+    k = _Field()  # Spatial frequencies, (L1,...,K)
+    mfld = _Field()  # Embedding funrction, (L1,...,N)
+    grad = _Field()  # Gradient of embedding, (L1,...,N,K)
+    hess = _Field()  # Hessian of embedding, (L1,...,N,K,K)
+    gmap = _Field()  # Gauss map of embedding, (L1,...,N,K)
+    vbeini = _Field()  # Inverse vielbein of manifold, (L1,...,K,K)[_a^A]
     shape: Tuple[int]
     ambient: int
     intrinsic: int
     flat: bool
+    _fields: Dict[str, Optional[array]]
+    _uses: Dict[str, int]
+    _waiting: Set[str]
 
     def __init__(self,
                  embed_ft: Optional[array] = None,
                  karr: Optional[array] = None):
+        self._fields = {name: None for name in _DEPENDS}
+        # number of uses outstanding, fields waiting to release dependencies
+        self._uses = {name: 0 for name in _DEPENDS}
+        self._waiting = set()
         self.ft = embed_ft
         self.k = karr
         if embed_ft is not None:
@@ -191,11 +351,50 @@ class SubmanifoldFTbundle():
             self.shape = kshape[:-1] + (2 * (kshape[-1] - 1),)
             self.intrinsic = embed_ft.ndim - 1
         self.flat = False
-        self.mfld = None
-        self.grad = None
-        self.hess = None
-        self.gmap = None
-        self.vbeini = None
+
+    def _get(self, name: str) -> Optional[array]:
+        """Stored field, computing it first if possible"""
+        if self._fields[name] is None and name in _CALC:
+            if all(getattr(self, dep) is not None for dep in _DEPENDS[name]):
+                getattr(self, _CALC[name])()
+        return self._fields[name]
+
+    def _set(self, name: str, value: Optional[array]):
+        """Store field, ending the uses of its dependencies if waiting"""
+        self._fields[name] = value
+        if value is not None and name in self._waiting:
+            self._waiting.discard(name)
+            self.release(*_DEPENDS[name])
+
+    def stored(self, name: str) -> Optional[array]:
+        """Field `name` if it has been stored, without computing it"""
+        return self._fields[name]
+
+    def request(self, *names: str):
+        """Declare uses of fields, so that others can be freed when done
+
+        Each name adds one use of that field, to be ended by `release`. If the
+        field is not stored, the fields it depends on get one use each, which
+        ends when it is computed.
+        """
+        for name in names:
+            self._uses[name] += 1
+            if self._fields[name] is None and name not in self._waiting:
+                self._waiting.add(name)
+                self.request(*_DEPENDS[name])
+
+    def release(self, *names: str):
+        """End uses of fields, freeing them if there are no more uses left
+        """
+        for name in names:
+            if self._uses[name] > 0:
+                self._uses[name] -= 1
+                if self._uses[name] == 0:
+                    self._fields[name] = None
+                    if name in self._waiting:
+                        # never computed, no longer needed
+                        self._waiting.discard(name)
+                        self.release(*_DEPENDS[name])
 
     def calc_embed(self):
         """
@@ -255,10 +454,32 @@ class SubmanifoldFTbundle():
             Array of vectors of spatial frequencies used in FFT, with
             singletons added to broadcast with `embed_ft`.
         """
+        self.hess = self.hess_block(slice(None))
+
+    def hess_block(self, ambient: slice) -> array:
+        """
+        Hessian of a block of embedding functions, without storing it
+
+        Returns
+        -------
+        hess
+            hess[s,t,...,i,a,b] = phi_ab^i(x1[s], x2[t], ...),
+            for i in `ambient`.
+
+        Parameters
+        ----------
+        ambient
+            slice of ambient dimensions, i.
+
+        Requires
+        --------
+        embed_ft, karr
+            see `calc_hess`
+        """
         axs = tuple(range(self.k.shape[-1]))
         ksq = self.k[..., None] * self.k[..., None, :]
-        self.hess = np.fft.irfftn(-ksq * self.ft[..., None, None],
-                                  axes=axs).view(array)
+        return np.fft.irfftn(-ksq * self.ft[..., ambient, None, None],
+                             axes=axs).view(array)
 
     def calc_gmap(self):
         """
@@ -288,8 +509,10 @@ class SubmanifoldFTbundle():
             grad[s,t,...,i,a] = phi_a^i(x1[s], x2[t], ...)
         """
         if self.intrinsic == 1:
-            self.vbeini = norm(self.grad, axis=-2, keepdims=True)
-            self.gmap = self.grad / self.vbeini
+            # storing vbeini can free grad
+            grad = self.grad
+            self.vbeini = norm(grad, axis=-2, keepdims=True)
+            self.gmap = grad / self.vbeini
         else:
             self.gmap, self.vbeini = qr_c(self.grad)
 
@@ -316,63 +539,40 @@ class SubmanifoldFTbundle():
         return other
 
     def copy(self):
-        """Deep copy
+        """Deep copy of stored fields
         """
         other = self.copy_basic()
-        if self.k is not None:
-            other.k = self.k.copy()
-        if self.ft is not None:
-            other.ft = self.ft.copy()
-        if self.mfld is not None:
-            other.mfld = self.mfld.copy()
-        if self.grad is not None:
-            other.grad = self.grad.copy()
-        if self.ft is not None:
-            other.hess = self.hess.copy()
-        if self.gmap is not None:
-            other.gmap = self.gmap.copy()
-        if self.vbeini is not None:
-            other.vbeini = self.vbeini.copy()
+        for name, value in self._fields.items():
+            if value is not None:
+                other._fields[name] = value.copy()
         return other
 
     def sel_ambient(self, N: int):
         """Restrict to the first N ambient dimensions in a shallow copy
         """
-        other = SubmanifoldFTbundle()
-        other.shape = self.shape
+        other = self.copy_basic()
         other.ambient = N
-        other.intrinsic = self.intrinsic
-        other.flat = self.flat
-        if self.ft is not None:
-            other.ft = self.ft[..., :N]
-        if self.mfld is not None:
-            other.mfld = self.mfld[..., :N]
-        if self.grad is not None:
-            other.grad = self.grad[..., :N, :]
-        if self.ft is not None:
-            other.hess = self.hess[..., :N, :, :]
-        if self.gmap is not None:
-            other.gmap = self.gmap[..., :N, :]
+        # number of axes after the ambient axis
+        after = {'ft': 0, 'mfld': 0, 'grad': 1, 'hess': 2, 'gmap': 1}
+        for name, num in after.items():
+            if self._fields[name] is not None:
+                ind = (Ellipsis, slice(N)) + (slice(None),) * num
+                other._fields[name] = self._fields[name][ind]
+        other.k = self.stored('k')
         return other
 
     def sel_intrinsic(self, K: int):
         """Restrict tangent space to the first K dimensions in a shallow copy
         """
-        other = SubmanifoldFTbundle()
-        other.shape = self.shape
-        other.ambient = self.ambient
+        other = self.copy_basic()
         other.intrinsic = K
-        other.flat = self.flat
-        if self.k is not None:
-            other.k = self.k[..., :K]
-        if self.grad is not None:
-            other.grad = self.grad[..., :K]
-        if self.ft is not None:
-            other.hess = self.hess[..., :K, :K]
-        if self.gmap is not None:
-            other.gmap = self.gmap[..., :K]
-        if self.vbeini is not None:
-            other.vbeini = self.vbeini[..., :K, :K]
+        # number of intrinsic axes at the end
+        last = {'k': 1, 'grad': 1, 'hess': 2, 'gmap': 1, 'vbeini': 2}
+        for name, num in last.items():
+            if self._fields[name] is not None:
+                ind = (Ellipsis,) + (slice(K),) * num
+                other._fields[name] = self._fields[name][ind]
+        return other
 
     def flattish(self):
         """Flatten intrinsic location indeces
@@ -380,29 +580,168 @@ class SubmanifoldFTbundle():
         self.shape = (np.prod(self.shape),)
         K = self.intrinsic
         N = self.ambient
-        if self.k is not None:
-            self.k = self.k.reshape((-1, 1, K))
-        if self.ft is not None:
-            self.ft = self.ft.reshape((-1, N))
-        if self.mfld is not None:
-            self.mfld = self.mfld.reshape((-1, N))
-        if self.grad is not None:
-            self.grad = self.grad.reshape((-1, N, K))
-        if self.ft is not None:
-            self.hess = self.hess.reshape((-1, N, K, K))
-        if self.gmap is not None:
-            self.gmap = self.gmap.reshape((-1, N, K))
-        if self.vbeini is not None:
-            self.vbeini = self.gmap.reshape((-1, K, K))
+        # shape of each field after intrinsic location indices
+        tail = {'k': (1, K), 'ft': (N,), 'mfld': (N,), 'grad': (N, K),
+                'hess': (N, K, K), 'gmap': (N, K), 'vbeini': (K, K)}
+        for name, shape in tail.items():
+            if self._fields[name] is not None:
+                self._fields[name] = self._fields[name].reshape((-1,) + shape)
         self.flat = True
 
 
+# =============================================================================
+# sample at arbitrary points
+# =============================================================================
+
+
+def random_features(num_dim: int,
+                    width: Sequence[float] = (1.0, 1.0),
+                    num_feat: int = 1024) -> (array, array):
+    """
+    Random Fourier features of a random Gaussian manifold with a covariance
+    matrix that is a Gaussian function of difference in position
+
+    Returns
+    -------
+    freqs : (F,K)
+        spatial frequencies, drawn from the spectral density of the
+        covariance, as in `gauss_sqrt_cov_ft`: normal, std dev `1/width`.
+    coeffs : (2,F,N)
+        coefficients of cosines and sines,
+        phi^i(x) = sum_f coeffs[0,f,i] cos(k_f.x) + coeffs[1,f,i] sin(k_f.x)
+
+    Parameters
+    ----------
+    num_dim
+        N, dimensionality of ambient space
+    width
+        tuple of std devs of gaussian cov along each intrinsic axis
+    num_feat
+        F, number of random features. The covariance is exact on average,
+        with fluctuations of order `1/sqrt(F)`.
+    """
+    freqs = np.random.randn(num_feat, len(width)) / np.array(width)
+    coeffs = np.random.randn(2, num_feat, num_dim)
+    coeffs /= np.sqrt(num_dim * num_feat)
+    return freqs, coeffs
+
+
+def halton_points(num_pts: int, num_dim: int, skip: int = 1) -> array:
+    """
+    Low discrepancy points in the unit cube, from the Halton sequence
+
+    Returns
+    -------
+    points : (P,K)
+        points[i, a] = radical inverse of `i + skip` in base of a'th prime.
+        Cover the cube more evenly than random points, and the first `P`
+        points are the same for any larger `num_pts`.
+
+    Parameters
+    ----------
+    num_pts
+        P, number of points
+    num_dim
+        K, dimensionality of cube
+    skip
+        number of points to skip at start. Default 1, skips the origin.
+    """
+    primes = []
+    cand = 2
+    while len(primes) < num_dim:
+        if all(cand % prm for prm in primes):
+            primes.append(cand)
+        cand += 1
+    points = np.zeros((num_pts, num_dim))
+    for a, base in enumerate(primes):
+        inds = np.arange(skip, skip + num_pts)
+        frac = 1.
+        while inds.any():
+            frac /= base
+            points[:, a] += frac * (inds % base)
+            inds //= base
+    return points
+
+
+def features_bundle(points: array,
+                    freqs: array,
+                    coeffs: array,
+                    hess: bool = False,
+                    mem_budget: int = 2**27) -> SubmanifoldFTbundle:
+    """
+    Random Gaussian manifold from random Fourier features, at given points
+
+    Returns
+    -------
+    mfld
+        `SubmanifoldFTbundle` with `mfld`, `grad` and, if `hess`, `hess`
+        stored. Its shape is `points.shape[:-1]`. The Gauss map can be
+        computed from `grad` as usual, but nothing that needs `ft`.
+
+    Parameters
+    ----------
+    points : (L1,L2,...,K)
+        intrinsic coordinates of points, e.g. scattered or a sparse grid.
+    freqs, coeffs
+        random Fourier features, from `random_features`.
+    hess
+        also compute the hessian? Default: False.
+    mem_budget
+        memory available for each batch of features, in bytes.
+        Default: 128MiB.
+
+    Notes
+    -----
+    Each field is a matrix product of the cosines and sines at a batch of
+    points with `coeffs`, costing `O(L F N)`, with no expanded grid.
+    """
+    shape = points.shape[:-1]
+    F, K = freqs.shape
+    N = coeffs.shape[-1]
+    flat_pts = points.reshape((-1, K))
+    num_pts = len(flat_pts)
+    emb = np.empty((num_pts, N))
+    grad = np.empty((num_pts, N, K))
+    hessian = np.empty((num_pts, N, K, K)) if hess else None
+    # phases, cosines, sines and scaled copies, (B,F)
+    batch = min(max(mem_budget // (5 * np.dtype(float).itemsize * F), 1),
+                num_pts)
+    # dbatch omits partial batches, round up. Slices stop at the end anyway
+    for pts in dbatch('point', 0, -(-num_pts // batch) * batch, batch):
+        # (B,K) @ (K,F) -> (B,F)
+        phase = flat_pts[pts] @ freqs.T
+        cos, sin = np.cos(phase), np.sin(phase)
+        # (B,F) @ (F,N) -> (B,N)
+        emb[pts] = cos @ coeffs[0] + sin @ coeffs[1]
+        for a in range(K):
+            # d/dx_a: cos -> -k_a sin, sin -> k_a cos
+            grad[pts, :, a] = ((cos * freqs[:, a]) @ coeffs[1]
+                               - (sin * freqs[:, a]) @ coeffs[0])
+            for b in range(a if hess else K, K):
+                # d^2/dx_a dx_b: cos -> -k_a k_b cos, sin -> -k_a k_b sin
+                kk = freqs[:, a] * freqs[:, b]
+                hessian[pts, :, a, b] = -((cos * kk) @ coeffs[0]
+                                          + (sin * kk) @ coeffs[1])
+                hessian[pts, :, b, a] = hessian[pts, :, a, b]
+
+    mfld = SubmanifoldFTbundle()
+    mfld.shape = shape
+    mfld.ambient = N
+    mfld.intrinsic = K
+    mfld.mfld = emb.reshape(shape + (N,)).view(array)
+    mfld.grad = grad.reshape(shape + (N, K)).view(array)
+    if hess:
+        mfld.hess = hessian.reshape(shape + (N, K, K)).view(array)
+    return mfld
+
+
 # =============================================================================
 # calculate intermediaries
 # =============================================================================
 
 
-def orth_hess(mfld: SubmanifoldFTbundle) -> array:
+def orth_hess(mfld: SubmanifoldFTbundle,
+              hess: Optional[array] = None) -> array:
     """
     Hessian projected onto orthonormal basis
 
@@ -415,31 +754,23 @@ def orth_hess(mfld: SubmanifoldFTbundle) -> array:
     ----------
     hess
         hess[s,t,i,a,b] = phi_ab^i(x1[s], x2[t], ...)
+        Default: `mfld.hess`. Can be for a subset of i.
     vbeini
         vbeini[s,t,...,A,a] = e^A_a(x1[s], x2[t], ...)
     """
     vbi = mfld.vbeini
-    hess = mfld.hess
+    if hess is None:
+        hess = mfld.hess
     if mfld.intrinsic == 1:
-        return hess / vbi**2
-    if mfld.intrinsic > 2:
-        return rtriu_solve(tril_solve(vbi.t, hess), vbi)
-
-    e00 = vbi[..., None, 0, 0]
-    e01 = vbi[..., None, 0, 1]
-    e11 = vbi[..., None, 1, 1]
-    hessr = np.empty_like(hess)
-    hessr[..., 0, 0] = hess[..., 0, 0] * e11**2
-    hessr[..., 0, 1] = (hess[..., 0, 1] * e00 - hess[..., 0, 0] * e01) * e11
-    hessr[..., 1, 0] = (hess[..., 1, 0] * e00 - hess[..., 0, 0] * e01) * e11
-    hessr[..., 1, 1] = (hess[..., 1, 1] * e00**2 + hess[..., 0, 0] * e01**2
-                        - (hess[..., 1, 0] + hess[..., 0, 1]) * e01 * e00)
-    # divide by determinant
-    hessr /= ((e00 * e11)**2).s
-    return hessr
+        # (L,1,1) -> (L,1,1,1), to broadcast over i
+        return hess / vbi[..., None]**2
+    # (L,K,K) -> (L,1,K,K), to broadcast over i
+    vbi = vbi[..., None, :, :]
+    if mfld.intrinsic > 3:
+        return rtriu_solve(tril_solve(mt(vbi), hess), vbi)
+    return triu_congruence(hess, vbi)
 
 
-@wrap_one
 def mat_field_evals(mat_field: array) -> array:
     """
     Eigenvalues of symmetric 2nd rank tensor field, `mat_field`
@@ -456,18 +787,11 @@ def mat_field_evals(mat_field: array) -> array:
     """
     if mat_field.shape[-1] == 1:
         return mat_field.squeeze(-1)
-    if mat_field.shape[-1] > 2:
+    if mat_field.shape[-1] > 3:
         return eigvalsh(mat_field)
+    return small_evalsh(mat_field)
 
-    tr_field = (mat_field[..., 0, 0] + mat_field[..., 1, 1]) / 2.0
-    det_field = (mat_field[..., 0, 0] * mat_field[..., 1, 1]
-                 - mat_field[..., 0, 1] * mat_field[..., 1, 0])
-    disc_sq = tr_field**2 - det_field
-    disc_field = np.sqrt(disc_sq).real
-    return np.stack((tr_field + disc_field, tr_field - disc_field), axis=-1)
 
-
-@wrap_one
 def mat_field_svals(mat_field: array) -> array:
     """
     Squared singular values of 2nd rank tensor field, `mat_field`
@@ -482,19 +806,9 @@ def mat_field_svals(mat_field: array) -> array:
     (sval1^2, sval2^2, ...)
         squared singular values, `sval1` > `sval2`, (L1,L2,...,K)
     """
-    if mat_field.shape[-1] == 1:
-        return norm(mat_field, axis=-2)**2
-    if mat_field.shape[-1] > 2:
+    if mat_field.shape[-1] > 3:
         return singvals(mat_field)**2
-
-    col_norms = norm(mat_field, axis=-2)
-    frob_field = col_norms.sum(axis=-1) / 2.0
-    det_field = (col_norms.prod(axis=-1)
-                 - mat_field.prod(axis=-1).sum(axis=-1)**2)
-    disc_sq = frob_field**2 - det_field
-    disc_sq[disc_sq < 0.] = 0.
-    dsc_field = np.sqrt(disc_sq).real
-    return np.stack((frob_field + dsc_field, frob_field - dsc_field), axis=-1)
+    return small_svalsq(mat_field)
 
 
 # =============================================================================
@@ -533,7 +847,7 @@ def numeric_distance(mfld: SubmanifoldFTbundle) -> (array, array):
     d[zero] = 1.
     ndx = np.where(zero, 0., dx / d)
     d[zero] = 0.
-    return d.uc, ndx.view(array)
+    return uncol(d), ndx
 
 
 def numeric_sines(mfld: SubmanifoldFTbundle) -> (array, array):
@@ -557,16 +871,133 @@ def numeric_sines(mfld: SubmanifoldFTbundle) -> (array, array):
     gmap = mfld.gmap
     mid = tuple(L // 2 for L in gmap.shape[:-2]) + (slice(None),)*2
     base_bein = gmap[mid]
-    bein_prod = base_bein.T @ gmap
+    bein_prod = cross_gram(base_bein, gmap)
     cosangs = mat_field_svals(bein_prod)
     cosangs[cosangs > 1.] = 1.
     return np.flip(np.sqrt(1. - cosangs), axis=-1)
 
 
-@wrap_one
+def numeric_distance_all(mfld: SubmanifoldFTbundle) -> array:
+    """
+    Root mean square Euclidean distance as a function of offset, averaged
+    over every point on the manifold as the centre.
+
+    Returns
+    -------
+    d
+        rms chord length, with zero offset at the middle.
+        d[s,t,...] = sqrt(mean_y ||phi(y + x[s,t,...] - x[mid]) - phi(y)||^2)
+
+    Parameters
+    ----------
+    mfld
+        `SubmanifoldFTbundle` of the manifold. Only its embedding functions
+        are used, mfld.mfld[s,t,...,i] = phi^i(x1[s], x2[t], ...)
+
+    Notes
+    -----
+    The manifold is periodic on the grid. The mean squared chord length is
+    `2 (C(0) - C(x))`, where `C(x) = mean_y phi(y + x).phi(y)` is the
+    autocorrelation, which is computed with FFTs. `mfld.ft` is not used,
+    as `irfftn` discards its non-Hermitian part on the `k_K = 0` plane.
+    """
+    axs = tuple(range(mfld.intrinsic))
+    embed_ft = np.fft.rfftn(mfld.mfld, axes=axs)
+    power = np.sum(embed_ft.real**2 + embed_ft.imag**2, axis=-1)
+    corr = np.fft.irfftn(power, s=mfld.shape, axes=axs) / np.prod(mfld.shape)
+    # zero offset: [0,0,...] -> [mid]
+    corr = np.fft.fftshift(corr)
+    mid = tuple(L // 2 for L in mfld.shape)
+    return np.sqrt(np.clip(2. * (corr[mid] - corr), 0., None)).view(array)
+
+
+def numeric_sines_centres(mfld: SubmanifoldFTbundle,
+                          centres: array,
+                          mem_budget: int = 2**27) -> array:
+    """
+    Sine of angle between tangent vectors, averaged over many centres
+
+    Returns
+    -------
+    sin(theta_max), sin(theta_min)
+        S[a][s,t,...] = tuple of mean_c sin theta_a[s,t,...]
+    theta_a
+        principal angles between tangent space at
+        (x1[s], x2[t], ...) - x[mid] + x[c] and tangent space at x[c]
+
+    Parameters
+    ----------
+    gmap
+        orthonormal basis for extrinsic tangent space,
+        gmap[s,t,...,i,A] = e_A^i(x[s,t]),
+    centres : array (M,K)
+        indices of the centres, see `sample_centres`.
+    mem_budget
+        memory available for each batch of overlaps, in bytes.
+        Default: 128MiB.
+
+    Notes
+    -----
+    The manifold is periodic on the grid, so every centre sees the same
+    offsets. The overlaps of a batch of centres with every tangent space
+    are computed with one matrix product, `(M*K,N) @ (N,L*K)`, then each
+    centre's sines are rolled so that it is at the middle.
+    """
+    gmap = mfld.gmap
+    shape = gmap.shape[:-2]
+    N, K = gmap.shape[-2:]
+    mid = tuple(L // 2 for L in shape)
+    # (L,N,K) -> (N,L,K) -> (N,L*K), each column is a tangent vector
+    flat_bein = np.moveaxis(gmap.reshape((-1, N, K)), 0, 1).reshape((N, -1))
+    # overlaps & squared singular values: (L,K,K) & (L,K) per centre
+    batch = min(max(mem_budget // (2 * K * flat_bein.nbytes // N), 1),
+                len(centres))
+
+    sines = np.zeros(shape + (K,))
+    # dbatch omits partial batches, round up. Slices stop at the end anyway
+    stop = -(-len(centres) // batch) * batch
+    for cents in dbatch('centre', 0, stop, batch):
+        centre = centres[cents]
+        # (M,N,K) -> (M,K,N) -> (M*K,N)
+        base_bein = mt(gmap[tuple(centre.T)]).reshape((-1, N))
+        # (M*K,N) @ (N,L*K) -> (M,K,L,K) -> (M,L,K,K) -> (M,L1,L2,...,K,K)
+        bein_prod = (base_bein @ flat_bein).reshape((len(centre), K, -1, K))
+        bein_prod = bein_prod.swapaxes(1, 2).reshape((-1,) + shape + (K, K))
+        cosangs = mat_field_svals(bein_prod)
+        cosangs[cosangs > 1.] = 1.
+        for cent, cosang in zip(centre, cosangs):
+            sines += np.roll(np.sqrt(1. - cosang), np.subtract(mid, cent),
+                             axis=tuple(range(len(shape))))
+    sines /= len(centres)
+    return np.flip(sines, axis=-1).view(array)
+
+
+def sample_centres(shape: Sequence[int], num_centres: int) -> array:
+    """
+    Random points on the grid, for `numeric_sines_centres`
+
+    Returns
+    -------
+    centres : array (M,K)
+        indices of the centres, without repeats.
+
+    Parameters
+    ----------
+    shape
+        K-tuple of numbers of sampling points on surface, (L1,L2,...)
+    num_centres
+        M, number of centres
+    """
+    num_centres = min(num_centres, np.prod(shape))
+    flat = np.random.choice(np.prod(shape), num_centres, replace=False)
+    return np.stack(np.unravel_index(flat, shape), axis=-1)
+
+
 def numeric_proj(ndx: array,
                  mfld: SubmanifoldFTbundle,
-                 inds: Tuple[slice, ...]) -> array:
+                 inds: Tuple[slice, ...],
+                 mem_budget: int = 2**27,
+                 cells: Optional[Sequence[int]] = None) -> array:
     """
     Cosine of angle between chord and tangent vectors
 
@@ -586,35 +1017,254 @@ def numeric_proj(ndx: array,
         gmap[s,t,...,i,A] = e_A^i(x1[s], x2[t], ...),
     inds
         K-tuple of slices for region to search over for lowest angle
+    mem_budget
+        memory available for each tile of cosines, in bytes. Default: 128MiB.
+    cells
+        K-tuple of sizes of blocks of tangent spaces for coarse-to-fine
+        search, see `numeric_proj_pruned` and `proj_cells`.
+        If None, search all tangent spaces for every chord.
+
+    Notes
+    -----
+    Chords and tangent spaces are processed in tiles, with one matrix product
+    per tile, `(B,N) @ (N,dL*K) -> (B,dL,K)`. The norm over K and maximum
+    over tangent spaces are taken for each tile, so nothing larger than a
+    tile is stored.
     """
-    flat_bein = mfld.gmap[inds].flatter(0, -2)  # (L,N,K)
-    # The limit here corresponds to 2GB memory per K (memory ~ size^2)
-    if np.prod(ndx.shape[:-1]) <= 2**14:
-        with dcontext('matmult'):
-            # (L1,...,LK,1,1,N) @ (L,N,K) -> (L1,...,LK,L,1,K)
-            # -> (L1,...,LK,L,1) -> (L1,...,LK)
-            costh = norm(ndx.r.r @ flat_bein, axis=-1).max(axis=(-2, -1))
-        # deal with central vector
-        costh[tuple(siz // 2 for siz in costh.shape)] = 1.
-        return costh
-
-    def calc_costh(chord):
-        """Calculate max cos(angle) between chord and any tangent vector"""
-        # (1,N) @ (L,N,K) -> (L,1,K) -> (L,1) -> ()
-        return norm(chord.r @ flat_bein, axis=-1).max()
-
-#    with dcontext('max matmult'):
-#        costh = np.apply_along_axis(calc_costh, -1, ndx)
-
-    costh = np.empty(ndx.shape[:-1])
-    for ii in dndindex(*ndx.shape[:-1]):
-        costh[ii] = np.apply_along_axis(calc_costh, -1, ndx[ii])
-    costh[tuple(siz // 2 for siz in ndx.shape[:-1])] = 1.
+    if cells is not None:
+        return numeric_proj_pruned(ndx, mfld, inds, cells, mem_budget)
+    gmap = mfld.gmap[inds]
+    N, K = gmap.shape[-2:]
+    # (L,N,K) -> (N,L,K) -> (N,L*K), each column is a tangent vector
+    flat_bein = np.moveaxis(gmap.reshape((-1, N, K)), 0, 1).reshape((N, -1))
+    flat_ndx = ndx.reshape((-1, N))
+    num_chords, num_tangs = len(flat_ndx), flat_bein.shape[1] // K
+    batch_chords, batch_tangs = proj_batch_size(num_chords, num_tangs, K,
+                                                mem_budget)
+
+    costh = np.zeros(num_chords)
+    # work array, (B,dL*K)
+    tile = np.empty((batch_chords, batch_tangs * K))
+    # dbatch omits partial batches, round up. Slices stop at the end anyway
+    stop_chords = -(-num_chords // batch_chords) * batch_chords
+    stop_tangs = -(-num_tangs // batch_tangs) * batch_tangs
+    for tangs in dbatch('tangent', 0, stop_tangs, batch_tangs):
+        bein = flat_bein[:, tangs.start * K:tangs.stop * K]
+        for chords in dbatch('chord', 0, stop_chords, batch_chords):
+            chord = flat_ndx[chords]
+            cos_tile = tile[:len(chord), :bein.shape[1]]
+            np.matmul(chord, bein, out=cos_tile)
+            # (B,dL*K) -> (B,dL,K) -> (B,dL) -> (B,)
+            cos_tile = norm(cos_tile.reshape((len(chord), -1, K))).max(-1)
+            np.maximum(costh[chords], cos_tile, out=costh[chords])
+
+    costh = costh.reshape(ndx.shape[:-1])
+    # deal with central vector
+    costh[tuple(siz // 2 for siz in costh.shape)] = 1.
+    return costh
+
+
+def numeric_proj_pruned(ndx: array,
+                        mfld: SubmanifoldFTbundle,
+                        inds: Tuple[slice, ...],
+                        cells: Sequence[int],
+                        mem_budget: int = 2**27,
+                        rank: Optional[int] = None) -> array:
+    """
+    Cosine of angle between chord and tangent vectors, coarse-to-fine
+
+    Same as `numeric_proj`, but the tangent spaces are grouped into `cells`.
+    For each tile of chords, a low rank basis for each cell gives an upper
+    bound on the cosines in that cell, and the cell with the highest bound
+    gives a lower bound for each chord. Only the cells whose upper bound
+    exceeds the lower bound for some chord in the tile are searched in full.
+
+    Returns
+    -------
+    costh
+        costh[s,t,...] = max_u,v,... (cos angle between tangent vector at
+        x[u,v,...] and chord between x[mid] and x[s,t,...]).
 
+    Parameters
+    ----------
+    ndx, mfld, inds, mem_budget
+        see `numeric_proj`
+    cells
+        K-tuple of sizes of blocks of tangent spaces, see `proj_cells`.
+    rank
+        number of basis vectors for each cell. Default: `3K`.
+
+    Notes
+    -----
+    If `Q` is an orthonormal basis and `E = QQ'E + R`, then
+    `|E'c| <= |Q'c| + |R|` for any unit vector `c`, as the columns of `E` are
+    orthonormal. `Q` is made of the leading left singular vectors of all the
+    tangent vectors in a cell, and `|R|` is the largest over the cell.
+    These are computed once for all chords. The result is exact, up to
+    rounding.
+    """
+    cell_bein, span, radius = cell_bases(mfld.gmap[inds], cells, rank)
+    N, num_cells, cell_size = cell_bein.shape
+    K = mfld.gmap.shape[-1]
+    rank = span.shape[-1] // num_cells
+    # allow for rounding
+    radius += 1e-10
+
+    flat_ndx = ndx.reshape((-1, N))
+    num_chords = len(flat_ndx)
+    batch_chords, batch_tangs = proj_batch_size(num_chords,
+                                                num_cells * cell_size // K,
+                                                K, mem_budget)
+    # small tiles of chords share fewer cells
+    batch_chords = min(batch_chords, 64)
+    batch_cells = max(batch_tangs * K // cell_size, 1)
+    costh = np.empty(num_chords)
+    # dbatch omits partial batches, round up. Slices stop at the end anyway
+    stop_chords = -(-num_chords // batch_chords) * batch_chords
+    for chords in dbatch('chord', 0, stop_chords, batch_chords):
+        chord = flat_ndx[chords]
+        # (B,N) @ (N,Lc*r) -> (B,Lc,r) -> (B,Lc)
+        upper = norm((chord @ span).reshape((len(chord), -1, rank))) + radius
+        # search the most promising cell for each chord first
+        # (B,1,N) @ (B,N,cL*K) -> (B,1,cL*K) -> (B,cL,K) -> (B,)
+        best = cell_bein[:, upper.argmax(-1)].swapaxes(0, 1)
+        costh[chords] = norm((chord[:, None] @ best).reshape((len(chord), -1,
+                                                              K))).max(-1)
+        # cells that could beat the lower bound for any chord in tile
+        search = np.flatnonzero(np.any(upper > costh[chords, None], axis=0))
+        for start in range(0, len(search), batch_cells):
+            fine = cell_bein[:, search[start:start + batch_cells]]
+            # (B,N) @ (N,dLc*cL*K) -> (B,dLc*cL,K) -> (B,dLc*cL) -> (B,)
+            cos_tang = chord @ fine.reshape((N, -1))
+            cos_tang = norm(cos_tang.reshape((len(chord), -1, K))).max(-1)
+            np.maximum(costh[chords], cos_tang, out=costh[chords])
+
+    costh = costh.reshape(ndx.shape[:-1])
+    # deal with central vector
+    costh[tuple(siz // 2 for siz in costh.shape)] = 1.
     return costh
 
 
-def numeric_curv(mfld: SubmanifoldFTbundle) -> array:
+def cell_bases(gmap: array,
+               cells: Sequence[int],
+               rank: Optional[int] = None) -> (array, array, array):
+    """
+    Tangent vectors grouped into cells, with a low rank basis for each cell
+
+    Returns
+    -------
+    cell_bein
+        tangent vectors in each cell, (N,Lc,cL*K), where Lc is the number of
+        cells and cL the number of tangent spaces per cell. Cells that
+        overhang the edge are padded with zero vectors.
+    span
+        leading left singular vectors of `cell_bein[:,c]`, (N,Lc*r).
+    radius
+        largest norm of the part of a tangent space in each cell that is not
+        in the span of its basis, (Lc,).
+
+    Parameters
+    ----------
+    gmap : array (L1,...,LK,N,K)
+        orthonormal basis for extrinsic tangent space,
+        gmap[s,t,...,i,A] = e_A^i(x1[s], x2[t], ...),
+    cells
+        K-tuple of sizes of blocks of tangent spaces, see `proj_cells`.
+    rank
+        r, number of basis vectors for each cell. Default: `3K`.
+    """
+    N, K = gmap.shape[-2:]
+    shape = gmap.shape[:-2]
+    num_cells = tuple(-(-siz // cell) for siz, cell in zip(shape, cells))
+    # zero vectors have zero cosine, so they never change the maximum
+    pad = [(0, ncell * cell - siz) for siz, cell, ncell
+           in zip(shape, cells, num_cells)]
+    gmap = np.pad(gmap, pad + [(0, 0), (0, 0)])
+    # (C1,c1,C2,c2,...,N,K) -> (N,C1,C2,...,c1,c2,...,K) -> (N,Lc,cL*K)
+    gmap = gmap.reshape(sum(zip(num_cells, cells), ()) + (N, K))
+    axes = (2 * K,) + tuple(range(0, 2 * K, 2)) + tuple(range(1, 2 * K, 2))
+    cell_bein = gmap.transpose(axes + (2 * K + 1,)).reshape(
+        (N, np.prod(num_cells), -1))
+
+    if rank is None:
+        rank = 3 * K
+    rank = min(rank, N, cell_bein.shape[-1])
+    # (Lc,N,cL*K) -> (Lc,N,r)
+    blocks = cell_bein.swapaxes(0, 1)
+    span = np.linalg.svd(blocks, full_matrices=False)[0][..., :rank]
+    # (Lc,N,cL*K) -> (Lc,N,cL,K) -> (Lc,cL,N,K) -> (Lc,cL,K,K) -> (Lc,cL)
+    resid = blocks - span @ (mt(span) @ blocks)
+    resid = resid.reshape(resid.shape[:2] + (-1, K)).swapaxes(1, 2)
+    radius = np.sqrt(np.clip(eigvalsh(gram(resid))[..., -1], 0., None))
+    # (Lc,N,r) -> (N,Lc,r) -> (N,Lc*r)
+    span = np.moveaxis(span, 0, 1).reshape((N, -1))
+    return cell_bein, span, radius.max(-1)
+
+
+def proj_cells(intrinsic_range: Sequence[float],
+               intrinsic_num: Sequence[int],
+               width: Sequence[float]) -> Tuple[int, ...]:
+    """
+    Sizes of blocks of tangent spaces for `numeric_proj_pruned`
+
+    Each block is about a third of a correlation length across, so that the
+    tangent spaces in a block are close to a low dimensional subspace, but
+    there are few blocks.
+
+    Returns
+    -------
+    cells
+        K-tuple of numbers of sampling points in each block along each axis.
+
+    Parameters
+    ----------
+    intrinsic_range
+        tuple of ranges of intrinsic coords [-intrinsic_range, intrinsic_range]
+    intrinsic_num
+        tuple of numbers of sampling points on surface
+    width
+        tuple of std devs of gaussian covariance along each intrinsic axis
+    """
+    return tuple(max(int(wid * num / (6. * ran)), 1) for ran, num, wid
+                 in zip(intrinsic_range, intrinsic_num, width))
+
+
+def proj_batch_size(num_chords: int,
+                    num_tangs: int,
+                    sub_dim: int,
+                    mem_budget: int = 2**27) -> (int, int):
+    """
+    Sizes of tiles for `numeric_proj`
+
+    Returns
+    -------
+    batch_chords
+        B, number of chords per tile.
+    batch_tangs
+        dL, number of tangent spaces per tile, all of them if it fits.
+
+    Parameters
+    ----------
+    num_chords
+        number of chords
+    num_tangs
+        L, number of tangent spaces in region
+    sub_dim
+        K, dimensionality of tangent spaces
+    mem_budget
+        memory available for each tile of cosines, in bytes.
+    """
+    tang_bytes = np.dtype(float).itemsize * sub_dim
+    # enough chords for an efficient matrix product, even if L is too large
+    batch_chords = min(num_chords, max(mem_budget // (tang_bytes * num_tangs),
+                                       64))
+    batch_tangs = min(num_tangs, max(mem_budget // (tang_bytes * batch_chords),
+                                     1))
+    return batch_chords, batch_tangs
+
+
+def numeric_curv(mfld: SubmanifoldFTbundle,
+                 mem_budget: int = 2**27) -> array:
     """
     Extrinsic curvature
 
@@ -626,22 +1276,54 @@ def numeric_curv(mfld: SubmanifoldFTbundle) -> array:
 
     Parameters
     ----------
-    hessr
-        hessian with one index raised
-        hessr[s,t,...,i,a,b] = phi_a^bi(x1[s], x2[t], ...)
+    hess
+        hessian, hess[s,t,...,i,a,b] = phi_ab^i(x1[s], x2[t], ...).
+        If `mfld.hess` is not stored, it is computed from `mfld.ft` in blocks
+        of ambient dimensions, see `SubmanifoldFTbundle.hess_block`.
     gmap
         orthonormal basis for extrinsic tangent space,
         gmap[s,t,...,i,a] = e_a^i(x1[s], x2[t], ...),
     vbein
         orthonormal basis for cotangent space,
         vbeini[s,t,...,i,a] = e_a^i(x1[s], x2[t], ...),
+    mem_budget
+        memory available for each block of the hessian, in bytes.
+        Default: 128MiB.
+
+    Notes
+    -----
+    Both terms are sums over ambient dimensions, `H_AB^i H_AB^i` and
+    `H_AB^C = H_AB^i e_C^i`, so they are accumulated over blocks of `i`.
+    Only `O(L K^3)` memory is needed, rather than `O(L N K^2)`.
     """
-    # hessian projected onto tangent space along a,b (L1,L2,...,K,K,N): H_AB^i
-    hessr = orth_hess(mfld).swapaxes(-1, -3)
-    # hessian projected onto tangent space along i (L1,L2,...,K,K,K): H_AB^C
-    hesst = hessr @ mfld.gmap[..., None, :, :]
-    # contract hessr along i, hesst along C, then both along A, leaving B1,B2
-    return np.sum(hessr @ hessr.t - hesst @ hesst.t, axis=-3)
+    K = mfld.intrinsic
+    N = mfld.gmap.shape[-2]
+    stored_hess = mfld.stored('hess')
+    if stored_hess is None:
+        # complex & real hessian, orthonormal hessian: ~4 real copies
+        bytes_per = 4 * np.dtype(float).itemsize * np.prod(mfld.shape) * K**2
+        batch = min(max(mem_budget // bytes_per, 1), N)
+    else:
+        batch = N
+    # third fundamental form & projection onto tangent space
+    kappa = np.zeros(mfld.shape + (K, K)).view(array)
+    # (L1,L2,...,K,K,K): H_AB^C
+    hesst = np.zeros(mfld.shape + (K, K, K)).view(array)
+    # dbatch omits partial batches, round up. Slices stop at the end anyway
+    for ambient in dbatch('ambient', 0, -(-N // batch) * batch, batch):
+        if stored_hess is None:
+            hess = mfld.hess_block(ambient)
+        else:
+            hess = stored_hess[..., ambient, :, :]
+        # hessian projected onto tangent space along a,b (L1,...,K,K,n): H_AB^i
+        hessr = orth_hess(mfld, hess).swapaxes(-1, -3)
+        # contract hessr along i, then along A, leaving B1,B2
+        kappa += np.sum(hessr @ mt(hessr), axis=-3)
+        # hessian projected onto tangent space along i (L1,...,K,K,K): H_AB^C
+        hesst += hessr @ mfld.gmap[..., None, ambient, :]
+    # contract hesst along C, then along A, leaving B1,B2
+    kappa -= np.sum(hesst @ mt(hesst), axis=-3)
+    return kappa
 
 
 # =============================================================================
@@ -653,7 +1335,11 @@ def get_all_numeric(ambient_dim: int,
                     intrinsic_range: Sequence[float],
                     intrinsic_num: Sequence[int],
                     width: Sequence[float] = (1.0, 1.0),
-                    expand: int = 2) -> (array, array, array, array):
+                    expand: int = 2,
+                    prune: bool = False,
+                    num_centres: int = 1,
+                    generator: Optional[ManifoldGenerator] = None
+                    ) -> (array, array, array, array):
     """
     Calculate everything
 
@@ -682,23 +1368,34 @@ def get_all_numeric(ambient_dim: int,
         tuple of std devs of gaussian covariance along each intrinsic axis
     expand
         factor to increase size by, to subsample later
+    prune
+        if True, use the coarse-to-fine search in `numeric_proj_pruned`,
+        otherwise search all tangent spaces for every chord (default).
+        Pruning has overheads, it only pays off with many sampling points
+        per correlation length.
+    num_centres
+        number of centres to average distances and sines over. If more than
+        one, distances are averaged over every point, see
+        `numeric_distance_all`, and sines over `num_centres` random points,
+        see `numeric_sines_centres`. Projections always use the middle.
+    generator
+        reused to draw the manifold, when calling repeatedly with the same
+        parameters. If None, one is made from the parameters above, which
+        must match it otherwise.
     """
 
-    with dcontext('k'):
-        karr = spatial_freq(intrinsic_range, intrinsic_num, expand)
+    if generator is None:
+        with dcontext('k'):
+            generator = ManifoldGenerator(ambient_dim, intrinsic_range,
+                                          intrinsic_num, width, expand)
     with dcontext('mfld'):
-        embed_ft = random_embed_ft(ambient_dim, karr, width)
-        mfld = SubmanifoldFTbundle(embed_ft, karr)
-        mfld.calc_embed()
-    with dcontext('grad'):
-        mfld.calc_grad()
-    with dcontext('hess'):
-        mfld.calc_hess()
-    with dcontext('e'):
-        mfld.calc_gmap()
+        mfld = generator.draw()
+        # computed when first used, grad is freed once gmap is computed,
+        # ft once the embedding is computed
+        mfld.request('ft', 'vbeini', 'gmap', 'mfld')
     with dcontext('K'):
         curvature = numeric_curv(mfld)
-    mfld.dump_ft()
+    mfld.release('ft', 'vbeini')
 
     int_begin = [(expand - 1) * inum // 2 for inum in intrinsic_num]
     int_end = [inum + ibeg for inum, ibeg in zip(intrinsic_num, int_begin)]
@@ -707,10 +1404,18 @@ def get_all_numeric(ambient_dim: int,
 
     with dcontext('d'):
         num_dist, ndx = numeric_distance(mfld)
+        if num_centres > 1:
+            num_dist = numeric_distance_all(mfld)
     with dcontext('a'):
-        num_sin = numeric_sines(mfld)
+        if num_centres > 1:
+            centres = sample_centres(mfld.shape, num_centres)
+            num_sin = numeric_sines_centres(mfld, centres)
+        else:
+            num_sin = numeric_sines(mfld)
     with dcontext('p'):
-        num_pr = numeric_proj(ndx, mfld, region)
+        cells = proj_cells(intrinsic_range, intrinsic_num, width)
+        num_pr = numeric_proj(ndx, mfld, region,
+                              cells=cells if prune else None)
     with dcontext('c'):
         num_curv = np.sqrt(mat_field_evals(curvature))
 
@@ -12,16 +12,41 @@ array
     Subclass of `numpy.ndarray` with properties such as `inv` for matrix
     division, `t` for transposing stacks of matrices, `c`, `r` and `s` for
     dealing with stacks of vectors and scalars.
+BufferArena
+    Store of named work arrays, reused across iterations of batch loops.
+
+Functions
+---------
+wrap_one
+    Create version of numpy function with single `array` output.
+mt, col, row, scal
+    Plain `ndarray` versions of `array.t`, `.c`, `.r`, `.s`.
+uncol, unrow, unscal
+    Plain `ndarray` versions of `array.uc`, `.ur`, `.us`.
+buffer
+    Work array from a `BufferArena`, or a new one if there is no arena.
+
+Notes
+-----
+Every operation on an `array` goes through ndarray subclass wrapping, which
+is a noticeable overhead for small arrays in batch loops. The numerical
+modules use plain `ndarray`s and the free functions internally, `array` is
+a convenience at the API boundary (see `bench-myarray.py`).
 """
 from functools import wraps
+from typing import Dict, Optional, Tuple
 import numpy as np
 from numpy.lib.mixins import _numeric_methods
 from ._gufuncs_cloop import pdist_ratio, cdist_ratio, norm  # matmul
+from ._gufuncs_cloop import vec_distort
+from ._gufuncs_cloop import small_evalsh, small_svalsq, triu_congruence
 from ._gufuncs_blas import matmul  # pdist_ratio, cdist_ratio, norm
+from ._gufuncs_blas import gram, cross_gram
 from ._gufuncs_lapack import (tril_solve, rtriu_solve, qr, qr_c,
-                              eigvalsh, singvals)
-assert all((pdist_ratio, cdist_ratio, norm))
+                              eigvalsh, singvals, mat_distort)
+assert all((pdist_ratio, cdist_ratio, norm, vec_distort, gram, cross_gram))
 assert all((eigvalsh, singvals, qr, qr_c, tril_solve, rtriu_solve))
+assert all((mat_distort, small_evalsh, small_svalsq, triu_congruence))
 # =============================================================================
 # Class: array
 # =============================================================================
@@ -80,7 +105,25 @@ class array(np.ndarray):
 #        # We are not adding any attributes
 #        pass
 
-    __matmul__, __rmatmul__, __imatmul__ = _numeric_methods(matmul, 'matmul')
+    __matmul__, __rmatmul__ = _numeric_methods(matmul, 'matmul')[:2]
+
+    def __imatmul__(self, other) -> 'array':
+        """In-place matrix multiplication, reusing the memory of `self`.
+
+        Parameters/Results
+        ------------------
+        a : array, (..., M, N) @= b : array, (..., N, N)
+
+        Raises
+        ------
+        ValueError
+            If the result would not have the same shape as `a`.
+        """
+        other = np.asanyarray(other)
+        if other.ndim < 2 or other.shape[-2] != other.shape[-1]:
+            raise ValueError('@= needs a stack of square matrices on the '
+                             'right, not shape {}.'.format(other.shape))
+        return matmul(self, other, out=(self,))
 
     @property
     def t(self) -> 'array':
@@ -93,7 +136,7 @@ class array(np.ndarray):
         ------------------
         a : array, (..., M, N) --> transposed : array, (..., N, M)
         """
-        return self.swapaxes(-1, -2)
+        return mt(self)
 
     @property
     def r(self) -> 'array':
@@ -105,7 +148,7 @@ class array(np.ndarray):
         ------------------
         a : array, (..., N) --> expanded : array, (..., 1, N)
         """
-        return self[..., None, :]
+        return row(self)
 
     @property
     def c(self) -> 'array':
@@ -117,7 +160,7 @@ class array(np.ndarray):
         ------------------
         a : array, (..., N) --> expanded : array, (..., N, 1)
         """
-        return self[..., None]
+        return col(self)
 
     @property
     def s(self) -> 'array':
@@ -129,7 +172,7 @@ class array(np.ndarray):
         ------------------
         a : array, (...,) --> expanded : array, (..., 1, 1)
         """
-        return self[..., None, None]
+        return scal(self)
 
     @property
     def ur(self) -> 'array':
@@ -144,7 +187,7 @@ class array(np.ndarray):
         ValueError
             If a.shape[-2] != 1
         """
-        return self.squeeze(axis=-2)
+        return unrow(self)
 
     @property
     def uc(self) -> 'array':
@@ -159,7 +202,7 @@ class array(np.ndarray):
         ValueError
             If a.shape[-1] != 1
         """
-        return self.squeeze(axis=-1)
+        return uncol(self)
 
     @property
     def us(self) -> 'array':
@@ -174,7 +217,7 @@ class array(np.ndarray):
         ValueError
             If a.shape[-2] != 1 or a.shape[-1] != 1
         """
-        return self.squeeze(axis=-2).squeeze(axis=-1)
+        return unscal(self)
 
     def flatter(self, start, stop) -> 'array':
         """Partial flattening.
@@ -195,6 +238,81 @@ class array(np.ndarray):
         return self.expand_dims(axis[0]).expand_dims(axis[1:])
 
 
+# =============================================================================
+# Plain ndarray versions of array properties
+# =============================================================================
+
+
+def mt(arr: np.ndarray) -> np.ndarray:
+    """Transpose last two indices, see `array.t`.
+
+    Parameters/Results
+    ------------------
+    a : ndarray, (..., M, N) --> transposed : ndarray, (..., N, M)
+    """
+    return arr.swapaxes(-1, -2)
+
+
+def row(arr: np.ndarray) -> np.ndarray:
+    """Treat multi-dim array as a stack of row vectors, see `array.r`.
+
+    Parameters/Results
+    ------------------
+    a : ndarray, (..., N) --> expanded : ndarray, (..., 1, N)
+    """
+    return arr[..., None, :]
+
+
+def col(arr: np.ndarray) -> np.ndarray:
+    """Treat multi-dim array as a stack of column vectors, see `array.c`.
+
+    Parameters/Results
+    ------------------
+    a : ndarray, (..., N) --> expanded : ndarray, (..., N, 1)
+    """
+    return arr[..., None]
+
+
+def scal(arr: np.ndarray) -> np.ndarray:
+    """Treat multi-dim array as a stack of scalars, see `array.s`.
+
+    Parameters/Results
+    ------------------
+    a : ndarray, (...,) --> expanded : ndarray, (..., 1, 1)
+    """
+    return arr[..., None, None]
+
+
+def unrow(arr: np.ndarray) -> np.ndarray:
+    """Undo effect of `row`, see `array.ur`.
+
+    Parameters/Results
+    ------------------
+    a : ndarray, (..., 1, N) --> squeezed : ndarray, (..., N)
+    """
+    return arr.squeeze(axis=-2)
+
+
+def uncol(arr: np.ndarray) -> np.ndarray:
+    """Undo effect of `col`, see `array.uc`.
+
+    Parameters/Results
+    ------------------
+    a : ndarray, (..., N, 1) --> squeezed : ndarray, (..., N)
+    """
+    return arr.squeeze(axis=-1)
+
+
+def unscal(arr: np.ndarray) -> np.ndarray:
+    """Undo effect of `scal`, see `array.us`.
+
+    Parameters/Results
+    ------------------
+    a : ndarray, (..., 1, 1) --> squeezed : ndarray, (...,)
+    """
+    return arr.squeeze(axis=-2).squeeze(axis=-1)
+
+
 # =============================================================================
 # Wrapping functionals
 # =============================================================================
@@ -219,3 +337,88 @@ def wrap_one(np_func):
     def wrapped(*args, **kwargs):
         return np_func(*args, **kwargs).view(array)
     return wrapped
+
+
+# =============================================================================
+# Reusable work arrays
+# =============================================================================
+
+
+class BufferArena():
+    """Store of named work arrays, reused between iterations of batch loops.
+
+    Asking for a buffer with the same name, shape and dtype as last time
+    returns the same memory, so a loop that only calls `get` allocates on its
+    first iteration. Contents are not reset between calls.
+
+    Examples
+    --------
+    >>> arena = BufferArena()
+    >>> for s in dbatch('s', 0, 1000, 10):
+    >>>     tmp = arena.get('tmp', (10, 3, 3))
+    >>>     matmul(x[s], y[s], out=tmp)
+    """
+    _bufs: Dict[str, np.ndarray]
+
+    def __init__(self):
+        self._bufs = {}
+
+    def get(self, name: str, shape: Tuple[int, ...],
+            dtype: type = float) -> np.ndarray:
+        """Work array called `name`, (re)allocated if shape/dtype change.
+
+        Parameters
+        ----------
+        name : str
+            Key for buffer. Different uses in one loop need different names.
+        shape : Tuple[int, ...]
+            Shape of buffer.
+        dtype : type = float
+            Data type of buffer.
+
+        Returns
+        -------
+        buf : ndarray
+            Uninitialised array of given shape and dtype.
+        """
+        shape = tuple(shape)
+        buf = self._bufs.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype)
+            self._bufs[name] = buf
+        return buf
+
+    def clear(self):
+        """Release all stored buffers
+        """
+        self._bufs.clear()
+
+    def nbytes(self) -> int:
+        """Total memory used by stored buffers
+        """
+        return sum(buf.nbytes for buf in self._bufs.values())
+
+
+def buffer(arena: Optional[BufferArena], name: str,
+           shape: Tuple[int, ...], dtype: type = float) -> np.ndarray:
+    """Work array from `arena`, or a new one if `arena` is None.
+
+    Parameters
+    ----------
+    arena : BufferArena or None
+        Store of reusable work arrays.
+    name : str
+        Key for buffer in `arena`.
+    shape : Tuple[int, ...]
+        Shape of buffer.
+    dtype : type = float
+        Data type of buffer.
+
+    Returns
+    -------
+    buf : ndarray
+        Uninitialised array of given shape and dtype.
+    """
+    if arena is None:
+        return np.empty(shape, dtype)
+    return arena.get(name, shape, dtype)
@@ -25,18 +25,23 @@ quick_options
 make_and_save
     generate data and save npz file
 """
-from typing import Tuple
+from typing import Optional, Tuple
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from ..iter_tricks import dbatch, denumerate
-from ..myarray import array, wrap_one, norm
+from ..iter_tricks import dbatch, dcount, denumerate, DisplayTemporary
+from ..backend import set_blas_threads
+from ..myarray import (array, norm, vec_distort, row, col, scal, uncol, unscal,
+                       BufferArena, buffer)
 
 # =============================================================================
 # generate vectors
 # =============================================================================
 
 
-@wrap_one
-def make_x(*siz: int)-> array:  # vector between cell centres
+def make_x(*siz: int,
+           rng: Optional[np.random.Generator] = None,
+           out: Optional[array] = None) -> array:  # vector between centres
     """
     Generate vector between cell centers.
 
@@ -48,20 +53,29 @@ def make_x(*siz: int)-> array:  # vector between cell centres
         R, number of repetitions
     ambient_dim
         N, dimensionality of ambient space
+    rng
+        random number generator. If None, use the legacy `np.random`.
+    out ndarray (R,N), optional
+        array to store vectors in. Only used with `rng`.
 
     Returns
     =======
     x ndarray (R,N)
         a random unit vector.
     """
-    x = np.random.randn(*siz)
+    if rng is None:
+        x = np.random.randn(*siz)
+    else:
+        x = rng.standard_normal(siz, out=out)
     x /= norm(x, keepdims=True)
     return x
 
 
 def make_y(x: array,
            theta: float,
-           *siz: int) -> array:  # vector between cell edges
+           *siz: int,
+           arena: Optional[BufferArena] = None,
+           rng: Optional[np.random.Generator] = None) -> array:  # btw edges
     """
     Generate vector from cell center to edge of ball that encloses cell, dx
 
@@ -73,6 +87,11 @@ def make_y(x: array,
         angle between `x` and `y`
     T, num_trials
         number of attempts to find cone vector of maximum distortion
+    arena
+        store of work arrays, reused when called in a loop.
+        With `rng`, `y` is stored in it, so it is overwritten by the next call.
+    rng
+        random number generator. If None, use the legacy `np.random`.
 
     Returns
     =======
@@ -87,15 +106,149 @@ def make_y(x: array,
     ==> theta = angle between x and y
     """
     cos_theta = np.cos(theta)
-    y = make_x(*siz, *x.shape)
-    cos_phi = (y.r @ x.c).uc
+    y = make_x(*siz, *x.shape, rng=rng,
+               out=None if rng is None else buffer(arena, 'y', siz + x.shape))
+    cos_phi = uncol(row(y) @ col(x))
     sin_ratio = np.sqrt((1 - cos_theta**2) / (1 - cos_phi**2))
     y *= sin_ratio
-    y += (cos_theta - cos_phi * sin_ratio) * x
+    # y += (cos_theta - cos_phi * sin_ratio) * x, without a (T,R,N) temporary
+    x_part = buffer(arena, 'x_part', y.shape)
+    cos_phi *= -sin_ratio
+    cos_phi += cos_theta
+    np.multiply(cos_phi, x, out=x_part)
+    y += x_part
 #    y *= cos_theta
     return y
 
 
+def split_x(x: array, num_top: int) -> (array, array):
+    """
+    Split vector between cell centres into leading coordinates and the rest.
+
+    Parameters
+    ==========
+    x array (R,N)
+        central vector of cone (unit length)
+    num_top
+        P, number of leading coordinates to keep, max(M)
+
+    Returns
+    =======
+    x_top ndarray (R,P)
+        first `P` coordinates of `x`
+    x_tail_sq ndarray (R,)
+        squared norm of the remaining `N - P` coordinates of `x`
+    """
+    return x[..., :num_top], np.sum(x[..., num_top:]**2, axis=-1)
+
+
+def make_dirn_top(x_top: array,
+                  x_tail_sq: array,
+                  ambient_dim: int,
+                  *siz: int,
+                  rng: np.random.Generator,
+                  out: Optional[array] = None) -> (array, array):
+    """
+    Leading coordinates of random unit vectors, and their overlap with x.
+
+    Same distribution as `make_x(*siz, *x.shape, rng=rng)[..., :P]`, but only
+    the first `P` coordinates are generated. The remaining `N - P` Gaussian
+    coordinates only enter through their squared norm and their dot product
+    with the tail of `x`. Split along the tail of `x`, these are `a^2 + b^2`
+    and `a |x_tail|` with `a ~ N(0,1)` and `b^2 ~ chi^2(N - P - 1)`.
+
+    Parameters
+    ==========
+    x_top array (R,P)
+        first `P` coordinates of central vector of cone, see `split_x`
+    x_tail_sq array (R,)
+        squared norm of the rest of central vector of cone
+    ambient_dim
+        N, dimensionality of ambient space
+    T, num_trials
+        number of random vectors for each repetition
+    rng
+        random number generator.
+    out ndarray (T,R,P), optional
+        array to store vectors in.
+
+    Returns
+    =======
+    dirn_top ndarray (T,R,P)
+        first `P` coordinates of random unit vectors
+    cos_phi ndarray (T,R)
+        dot product of random unit vectors with the whole of `x`.
+    """
+    num_top = x_top.shape[-1]
+    dirn = rng.standard_normal(siz + x_top.shape, out=out)
+    tail_x = rng.standard_normal(siz + x_tail_sq.shape)
+    if num_top == ambient_dim:
+        tail_x[...] = 0.
+    # chi^2(k) = 2 Gamma(k/2), which is also fine for k = 0
+    nrm_sq = 2 * rng.standard_gamma(max(ambient_dim - num_top - 1, 0) / 2,
+                                    siz + x_tail_sq.shape)
+    nrm_sq += tail_x**2
+    nrm_sq += norm(dirn)**2
+    nrm = np.sqrt(nrm_sq)
+    cos_phi = unscal(row(dirn) @ col(x_top))
+    cos_phi += tail_x * np.sqrt(x_tail_sq)
+    cos_phi /= nrm
+    dirn /= col(nrm)
+    return dirn, cos_phi
+
+
+def make_y_top(x_top: array,
+               x_tail_sq: array,
+               theta: float,
+               ambient_dim: int,
+               *siz: int,
+               rng: np.random.Generator,
+               arena: Optional[BufferArena] = None) -> array:
+    """
+    Leading coordinates of vectors from cell center to edge of ball.
+
+    Same distribution as `make_y(x, theta, *siz, rng=rng)[..., :P]`, but only
+    the first `P` coordinates are generated, see `make_dirn_top`. This is all
+    that `distortion` needs when `P = max(M)`.
+
+    Parameters
+    ==========
+    x_top array (R,P)
+        first `P` coordinates of central vector of cone, see `split_x`
+    x_tail_sq array (R,)
+        squared norm of the rest of central vector of cone
+    theta
+        angle between `x` and `y`
+    ambient_dim
+        N, dimensionality of ambient space
+    T, num_trials
+        number of attempts to find cone vector of maximum distortion
+    rng
+        random number generator.
+    arena
+        store of work arrays, reused when called in a loop.
+        `y_top` is stored in it, so it is overwritten by the next call.
+
+    Returns
+    =======
+    y_top ndarray (T,R,P)
+        first `P` coordinates of unit vector in direction from origin to the
+        edge of the cone
+    """
+    cos_theta = np.cos(theta)
+    y, cos_phi = make_dirn_top(x_top, x_tail_sq, ambient_dim, *siz, rng=rng,
+                               out=buffer(arena, 'y', siz + x_top.shape))
+    sin_ratio = np.sqrt((1 - cos_theta**2) / (1 - cos_phi**2))
+    y *= col(sin_ratio)
+    # y += (cos_theta - cos_phi * sin_ratio) * x, without a (T,R,P) temporary
+    x_part = buffer(arena, 'x_part', y.shape)
+    cos_phi *= -sin_ratio
+    cos_phi += cos_theta
+    np.multiply(col(cos_phi), x_top, out=x_part)
+    y += x_part
+    return y
+
+
 # =============================================================================
 # calculate intermediaries
 # =============================================================================
@@ -163,7 +316,9 @@ def guarantee(distort: float,
 
 
 def distortion(vec: array,
-               proj_dims: array) -> array:
+               proj_dims: array,
+               arena: Optional[BufferArena] = None,
+               ambient_dim: Optional[int] = None) -> array:
     """distortion of vec under projection
 
     Distortion of `vec` under projection.
@@ -172,22 +327,183 @@ def distortion(vec: array,
 
     Parameters
     ==========
-    vec ndarray (dT,R,N)
-        unit vector being projected
-    proj_dims ndarray (#(M),R)
+    vec ndarray (dT,R,N) or (dT,R,P)
+        unit vector being projected, or its first `P >= max(M)` coordinates
+    proj_dims ndarray (#(M),)
+        M, dimensionality of projected space
+    arena
+        store of work arrays, reused when called in a loop
+    ambient_dim
+        N, dimensionality of ambient space. Default: `vec.shape[-1]`.
+
+    Returns
+    =======
+    epsilon (#(M),R)
+        distortion of vec under projection, maximised over trials
+
+    Notes
+    =====
+    The norms for all M come from one pass of running sums of squares, and the
+    maximum over trials is taken in the same loop, see `vec_distort`.
+    """
+    if ambient_dim is not None and ambient_dim != vec.shape[-1]:
+        # vec_distort takes N from the length of vec, rescale to get N / M
+        vec = np.multiply(vec, np.sqrt(ambient_dim / vec.shape[-1]),
+                          out=buffer(arena, 'scaled', vec.shape))
+    # (dT,R,N) -> (R,dT,N), trials become a core dimension of the gufunc
+    trials = vec.reshape((-1,) + vec.shape[-2:]).swapaxes(0, 1)
+    # (R,#(M)) -> (#(M),R)
+    return vec_distort(trials, proj_dims).T
+
+
+def distortion_cone(x: array,
+                    theta: float,
+                    proj_dims: array) -> array:
+    """maximum distortion of y in chordal cone, exactly
+
+    Maximum distortion of all unit vectors `y` at angle `theta` to `x`.
+
+    Assumes projection is onto first `proj_dim` dimensions & x is normalised
+
+    Parameters
+    ==========
+    x ndarray (R,N)
+        central vector of cone (unit length)
+    theta
+        angle between `x` and `y`
+    proj_dims ndarray (#(M),)
         M, dimensionality of projected space
 
     Returns
     =======
     epsilon (#(M),R)
-        distortion of vec under projection
+        distortion of y under projection, maximised over the cone
+
+    Notes
+    =====
+    With `y = x cos(theta) + u sin(theta)`, `u` perpendicular to `x`, the
+    extremes of `|Py|` have `u` in the span of `Px` and `x - Px`. There,
+    `|Py| = cos(phi -+ theta)`, where `cos(phi) = |Px|`, unless the cone
+    contains a vector in the projected space (`|Py| = 1`, needs M > 1)
+    or its complement (`|Py| = 0`, needs N - M > 1). The distortion is
+    convex in `|Py|`, so it is maximised at one of these extremes.
+    """
+    N = x.shape[-1]
+    M = col(proj_dims)  # (#(M),1)
+    sum_sq = np.cumsum(x**2, axis=-1)  # (R,N)
+    # angle between x and projected space, (#(M),R)
+    phi = np.arccos(np.sqrt(np.clip(sum_sq[..., proj_dims - 1].T, 0., 1.)))
+    # largest |Py|
+    cos_hi = np.cos(phi - theta)
+    cos_hi[(phi < theta) & (M > 1)] = 1.
+    # smallest |Py|
+    cos_lo = np.abs(np.cos(phi + theta))
+    cos_lo[(phi + theta > np.pi / 2) & (N - M > 1)] = 0.
+    scale = np.sqrt(N / M)
+    return np.maximum(np.abs(scale * cos_hi - 1.), np.abs(scale * cos_lo - 1.))
+
+
+def distortion_thetas(dirn: array,
+                      x: array,
+                      thetas: array,
+                      proj_dims: array,
+                      cos_phi: Optional[array] = None,
+                      ambient_dim: Optional[int] = None) -> array:
+    """distortion of cone vectors for all thetas, from one set of directions
+
+    Distortion of the vectors `make_y` would build from the random unit
+    vectors `dirn`, for each `theta`.
+
+    Assumes projection is onto first `proj_dim` dimensions
+
+    Parameters
+    ==========
+    dirn ndarray (dT,R,N) or (dT,R,P)
+        random unit vectors, as drawn by `make_x` in `make_y`,
+        or their first `P >= max(M)` coordinates, see `make_dirn_top`
+    x ndarray (R,N) or (R,P)
+        central vector of cone (unit length), or its first `P` coordinates
+    thetas ndarray (#(th),)
+        angles between `x` and `y`
+    proj_dims ndarray (#(M),)
+        M, dimensionality of projected space
+    cos_phi ndarray (dT,R), optional
+        dot products of `dirn` with `x`. Needed if only `P` coordinates given.
+    ambient_dim
+        N, dimensionality of ambient space. Default: `x.shape[-1]`.
+
+    Returns
+    =======
+    epsilon (#(th),#(M),R)
+        distortion of y under projection, maximised over trials
+
+    Notes
+    =====
+    With `y = s dirn + c x`, `|Py|^2 = s^2 |P dirn|^2 + 2sc P dirn.Px
+    + c^2 |Px|^2`, where only `s` and `c` depend on `theta`. The prefix sums
+    are computed once for all `theta`, and only up to `max(M)`.
+    """
+    N = x.shape[-1] if ambient_dim is None else ambient_dim
+    last = proj_dims - 1
+    top = proj_dims.max()
+    # prefix sums for each M, (#(M),dT,R)
+    dirn_sq = np.cumsum(dirn[..., :top]**2, axis=-1)[..., last]
+    dirn_sq = np.moveaxis(dirn_sq, -1, 0)
+    dirn_x = np.cumsum(dirn[..., :top] * x[..., :top], axis=-1)[..., last]
+    dirn_x = np.moveaxis(dirn_x, -1, 0)
+    # (R,#(M)) -> (#(M),1,R)
+    x_sq = row(np.cumsum(x[..., :top]**2, axis=-1)[..., last].T)
+    # coefficients of dirn and x for each theta, (#(th),1,dT,R), see make_y
+    if cos_phi is None:
+        cos_phi = unscal(row(dirn) @ col(x))
+    theta = scal(col(np.asarray(thetas)))
+    dirn_coef = np.sin(theta) / np.sqrt(1 - cos_phi**2)
+    x_coef = np.cos(theta) - cos_phi * dirn_coef
+    # |Py|^2, (#(th),#(M),dT,R)
+    proj_sq = dirn_coef**2 * dirn_sq
+    proj_sq += 2 * dirn_coef * x_coef * dirn_x
+    proj_sq += x_coef**2 * x_sq
+    np.maximum(proj_sq, 0., out=proj_sq)
+    proj_sq *= N / scal(proj_dims)
+    return np.amax(np.abs(np.sqrt(proj_sq) - 1.), axis=-2)
+
+
+# =============================================================================
+# batches of trials
+# =============================================================================
+
+
+def batch_size(num_trials: int,
+               num_reps: int,
+               ambient_dim: int,
+               mem_budget: int = 2**23) -> int:
+    """number of trials per batch
+
+    Largest batch size for `make_y` and `distortion` whose work arrays fit
+    in `mem_budget`, and no more than `num_trials`. The last batch of
+    `comparison` has the remainder, so no more than `num_trials` are run.
+
+    Parameters
+    ==========
+    num_trials
+        T, number of comparisons to find maximum distortion
+    num_reps
+        R, number of times to repeat each comparison
+    ambient_dim
+        N, dimensionality of ambient space, or of the part generated,
+        see `make_y_top`
+    mem_budget
+        memory available for work arrays, in bytes. Default: 8MiB, as larger
+        batches are slower once the work arrays no longer fit in cache.
+
+    Returns
+    =======
+    batch_trials
+        dT, size of chunks to perform trials into. At least 1.
     """
-    axs = tuple(range(proj_dims.ndim, proj_dims.ndim + vec.ndim - 2))
-    N = vec.shape[-1]
-    eps = np.empty(proj_dims.shape + vec.shape[:-1])
-    for m, M in enumerate(proj_dims):
-        eps[m] = np.abs(np.sqrt(N / M) * norm(vec[..., 0:M]) - 1.)
-    return np.amax(eps, axis=axs)
+    # y, x_part (dT,R,N) + cos_phi, sin_ratio, norm (dT,R)
+    trial_bytes = np.dtype(float).itemsize * num_reps * (2 * ambient_dim + 3)
+    return max(min(mem_budget // trial_bytes, num_trials), 1)
 
 
 # =============================================================================
@@ -198,7 +514,11 @@ def distortion(vec: array,
 def comparison(reps: Tuple[int],
                theta: float,
                proj_dims: array,
-               ambient_dim: int) -> (float, float, float, float):
+               ambient_dim: int,
+               exact: bool = False,
+               rng: Optional[np.random.Generator] = None,
+               mem_budget: int = 2**23,
+               reduced: bool = True) -> (float, float, float, float):
     r"""comparison of theory and experiment
 
     Comparison of theory and experiment
@@ -231,7 +551,9 @@ def comparison(reps: Tuple[int],
         num_trials
             T, number of comparisons to find maximum distortion
         batch_trials
-            dT, size of chunks to perform trials into
+            dT, size of chunks to perform trials into,
+            or None to choose it from `mem_budget`, see `batch_size`.
+            The last chunk is smaller if dT does not divide T.
         num_reps
             R, number of times to repeat each comparison
     ambient_dim
@@ -240,19 +562,117 @@ def comparison(reps: Tuple[int],
         M, dimensionality of projected space
     theta
         angle between centre and edge of chordal cone
+    exact
+        if True, compute `epsy` with `distortion_cone` instead of sampling
+        `num_trials` vectors from the edge of the cone.
+    rng
+        random number generator for `x` and the trials. If None, `x` comes
+        from the legacy `np.random` and the trials from a generator seeded
+        from its state, so `np.random.seed` still applies.
+    mem_budget
+        memory available for work arrays of trials, in bytes.
+    reduced
+        if True, only generate the first `max(M)` coordinates of the trials,
+        see `make_y_top`. Same distribution, fewer random numbers and flops.
     """
     (num_trials, batch_trials, num_reps) = reps
 
-    x = make_x(num_reps, ambient_dim)
+    x = make_x(num_reps, ambient_dim, rng=rng)
     epsx = distortion(x, proj_dims)
-    epsy = np.zeros(proj_dims.shape + (num_reps,))
+    if exact:
+        epsy = distortion_cone(x, theta, proj_dims)
+    else:
+        epsy = np.zeros(proj_dims.shape + (num_reps,))
+        if rng is None:
+            rng = np.random.default_rng(np.random.randint(2**31))
+        vec_dim = proj_dims.max() if reduced else ambient_dim
+        x_top, x_tail_sq = split_x(x, vec_dim)
+        if batch_trials is None:
+            batch_trials = batch_size(num_trials, num_reps, vec_dim,
+                                      mem_budget)
+        # work arrays, allocated on first batch
+        arena = BufferArena()
+        # dbatch omits partial batches, round up & shorten the last one
+        for i in dbatch('trial', 0, -(-num_trials // batch_trials)
+                        * batch_trials, batch_trials):
+            num = min(i.stop, num_trials) - i.start
+            if reduced:
+                y = make_y_top(x_top, x_tail_sq, theta, ambient_dim,
+                               num, rng=rng, arena=arena)
+            else:
+                y = make_y(x, theta, num, arena=arena, rng=rng)
+            np.maximum(epsy, distortion(y, proj_dims, arena, ambient_dim),
+                       out=epsy)
+
+    gnt = guarantee(epsy, theta, col(proj_dims), ambient_dim)
+    gnti = guarantee_inv(epsx, theta, proj_dims[..., None], ambient_dim)
+
+    return epsx, gnt, epsy, gnti
 
-    for i in dbatch('trial', 0, num_trials, batch_trials):
-        y = make_y(x, theta, batch_trials)
-        np.maximum(epsy, distortion(y, proj_dims), out=epsy)
 
-    gnt = guarantee(epsy, theta, proj_dims.c, ambient_dim)
-    gnti = guarantee_inv(epsx, theta, proj_dims[..., None], ambient_dim)
+def comparison_shared(reps: Tuple[int],
+                      thetas: array,
+                      proj_dims: array,
+                      ambient_dim: int,
+                      rng: Optional[np.random.Generator] = None,
+                      mem_budget: int = 2**23,
+                      reduced: bool = True) -> (array, array, array, array):
+    r"""comparison of theory and experiment, for all thetas at once
+
+    Like `comparison`, but all `thetas` use the same `x` and the same random
+    directions for the trials, see `distortion_thetas`. This divides the
+    random number generation and most of the arithmetic by #(th).
+
+    Returns
+    =======
+    epsx ndarray (#(th),#(M),R)
+        distortion of x
+    gnt ndarray (#(th),#(M),R)
+        guarantee(maximum distortion of y) for y in chordal cone
+    epsy ndarray (#(th),#(M),R)
+        maximum distortion of y for y in chordal cone
+    gnti ndarray (#(th),#(M),R)
+        guarantee(gnti) = distortion of x
+
+    Parameters
+    ==========
+    reps, proj_dims, ambient_dim, rng, mem_budget, reduced
+        see `comparison`.
+    thetas ndarray (#(th),)
+        array of angles between centre and edge of chordal cone
+    """
+    (num_trials, batch_trials, num_reps) = reps
+    thetas = np.asarray(thetas)
+    out_shape = thetas.shape + proj_dims.shape + (num_reps,)
+
+    x = make_x(num_reps, ambient_dim, rng=rng)
+    epsx = np.empty(out_shape)
+    epsx[...] = distortion(x, proj_dims)
+    epsy = np.zeros(out_shape)
+    if rng is None:
+        rng = np.random.default_rng(np.random.randint(2**31))
+    vec_dim = proj_dims.max() if reduced else ambient_dim
+    x_top, x_tail_sq = split_x(x, vec_dim)
+    if batch_trials is None:
+        batch_trials = batch_size(num_trials, num_reps, vec_dim, mem_budget)
+    # work arrays, allocated on first batch
+    arena = BufferArena()
+    # dbatch omits partial batches, round up & shorten the last one
+    for i in dbatch('trial', 0, -(-num_trials // batch_trials) * batch_trials,
+                    batch_trials):
+        num = min(i.stop, num_trials) - i.start
+        out = buffer(arena, 'dirn', (num,) + x_top.shape)
+        if reduced:
+            dirn, cos_phi = make_dirn_top(x_top, x_tail_sq, ambient_dim,
+                                          num, rng=rng, out=out)
+        else:
+            dirn, cos_phi = make_x(num, *x.shape, rng=rng, out=out), None
+        np.maximum(epsy, distortion_thetas(dirn, x_top, thetas, proj_dims,
+                                           cos_phi, ambient_dim), out=epsy)
+
+    theta = col(col(thetas))
+    gnt = guarantee(epsy, theta, col(proj_dims), ambient_dim)
+    gnti = guarantee_inv(epsx, theta, col(proj_dims), ambient_dim)
 
     return epsx, gnt, epsy, gnti
 
@@ -260,7 +680,12 @@ def comparison(reps: Tuple[int],
 def generate_data(reps: Tuple[int],
                   ambient_dim: int,
                   thetas: array,
-                  proj_dims: array):
+                  proj_dims: array,
+                  exact: bool = False,
+                  num_workers: Optional[int] = None,
+                  seed: Optional[int] = None,
+                  shared: bool = False,
+                  rate: bool = False):
     r"""generate all data for plots
 
     Generate all data for plots and legend
@@ -287,6 +712,9 @@ def generate_data(reps: Tuple[int],
         guarantee(gnti) = distortion of x
     leg
         legend text associated with corresponding datum
+    trials_per_s
+        number of sampled trials per second, only returned if `rate`.
+        None if `exact`, as no trials are sampled.
 
     Parameters
     ==========
@@ -294,7 +722,8 @@ def generate_data(reps: Tuple[int],
         num_trials
             T, number of comparisons to find maximum distortion
         batch_trials
-            dT, size of chunks to perform trials into
+            dT, size of chunks to perform trials into, or None for automatic.
+            The last chunk is smaller if dT does not divide T.
         num_reps
             R, number of times to repeat each comparison
     ambient_dim
@@ -303,24 +732,178 @@ def generate_data(reps: Tuple[int],
         M, array of dimensionalities of projected space
     thetas ndarray (#(th),)
         array of angles between centre and edge of chordal cone
+    exact
+        if True, compute `epsy` with `distortion_cone` instead of sampling.
+    num_workers
+        if None, loop over `thetas` in this process, with the legacy
+        `np.random`. Otherwise, split into (theta, repetition) work units
+        with independent random streams, run on this many processes.
+        Results do not depend on `num_workers`, see `sweep_parallel`.
+    seed
+        entropy for the random streams of the work units. If None, drawn
+        from the legacy `np.random`. Only used with `num_workers`.
+    shared
+        if True, all `thetas` use the same `x` and random trial directions,
+        see `comparison_shared`. Ignored if `exact`.
+    rate
+        if True, also return the number of sampled trials per second.
     """
+    shared = shared and not exact
+    if num_workers is not None:
+        return sweep_parallel(reps, ambient_dim, thetas, proj_dims, exact,
+                              num_workers, seed, shared, rate)
     epsx = np.zeros((len(thetas), len(proj_dims), reps[2]))
     gnt = np.zeros((len(thetas), len(proj_dims), reps[2]))
     epsy = np.zeros((len(thetas), len(proj_dims), reps[2]))
     gnti = np.zeros((len(thetas), len(proj_dims), reps[2]))
     leg = []
 
-    for t, theta in denumerate('theta', thetas):
-        (epsx[t], gnt[t],
-         epsy[t], gnti[t]) = comparison(reps, theta, proj_dims, ambient_dim)
+    tic = perf_counter()
+    if shared:
+        epsx[...], gnt[...], epsy[...], gnti[...] = comparison_shared(
+            reps, thetas, proj_dims, ambient_dim)
+    else:
+        for t, theta in denumerate('theta', thetas):
+            (epsx[t], gnt[t], epsy[t],
+             gnti[t]) = comparison(reps, theta, proj_dims, ambient_dim, exact)
+
+    for t in range(len(thetas)):
+        for m in range(len(proj_dims)):
+            leg.append(leg_text(t, m, thetas, proj_dims))
+        # extra element at end of each row: label with value of theta
+        leg.append(leg_text(t, len(proj_dims), thetas, proj_dims))
+
+    if rate:
+        return (epsx, gnt, epsy, gnti, leg,
+                _trial_rate(reps, thetas, tic, exact))
+    return epsx, gnt, epsy, gnti, leg
+
+
+def _trial_rate(reps: Tuple[int], thetas: array, tic: float,
+                exact: bool = False) -> Optional[float]:
+    """Number of sampled trials per second since `tic`, from `perf_counter`
+
+    None if `exact`, as `distortion_cone` replaces the trials.
+    """
+    if exact:
+        return None
+    num_trials = len(thetas) * reps[0] * reps[2]
+    return num_trials / (perf_counter() - tic)
+
+
+# =============================================================================
+# parallel sweep
+# =============================================================================
+
+
+def _init_worker():
+    """Suppress displays and pin BLAS to one thread in a worker process"""
+    DisplayTemporary.output = False
+    set_blas_threads(1)
+
+
+def _comparison_unit(unit: tuple) -> tuple:
+    """One (theta, repetition) work unit of `sweep_parallel`
+
+    Parameters
+    ==========
+    unit (t, r, reps, theta, proj_dims, ambient_dim, exact, seed_seq)
+        indices, arguments of `comparison` for one repetition, and the
+        `SeedSequence` for this unit's random stream. If `t` is a slice,
+        `theta` is an array, and `comparison_shared` is used.
+
+    Returns
+    =======
+    (t, r, epsx, gnt, epsy, gnti)
+        indices, and outputs of `comparison`, each (#(M),),
+        or of `comparison_shared`, each (#(th),#(M)).
+    """
+    t, r, reps, theta, proj_dims, ambient_dim, exact, seed_seq = unit
+    rng = np.random.default_rng(seed_seq)
+    one_rep = (reps[0], reps[1], 1)
+    if isinstance(t, slice):
+        out = comparison_shared(one_rep, theta, proj_dims, ambient_dim, rng)
+    else:
+        out = comparison(one_rep, theta, proj_dims, ambient_dim, exact, rng)
+    return (t, r) + tuple(val[..., 0] for val in out)
+
+
+def sweep_parallel(reps: Tuple[int],
+                   ambient_dim: int,
+                   thetas: array,
+                   proj_dims: array,
+                   exact: bool = False,
+                   num_workers: int = 1,
+                   seed: Optional[int] = None,
+                   shared: bool = False,
+                   rate: bool = False):
+    r"""generate all data for plots, in parallel
+
+    Same outputs as `generate_data`, but each (theta, repetition) is a
+    separate work unit, with its own `x` and trials drawn from a child of one
+    `SeedSequence`. The child depends only on the unit's position, so the
+    results are the same for any `num_workers` or order of completion.
+    If `shared`, each work unit is one repetition, for all thetas.
+
+    Parameters
+    ==========
+    reps, ambient_dim, thetas, proj_dims, exact, shared, rate
+        see `generate_data`.
+    num_workers
+        number of processes. If 1, run in this process. Workers do not
+        display progress and use one BLAS thread each.
+    seed
+        entropy for the `SeedSequence`. If None, drawn from the legacy
+        `np.random`, so `np.random.seed` still applies.
+    """
+    num_reps = reps[2]
+    epsx = np.zeros((len(thetas), len(proj_dims), num_reps))
+    gnt = np.zeros((len(thetas), len(proj_dims), num_reps))
+    epsy = np.zeros((len(thetas), len(proj_dims), num_reps))
+    gnti = np.zeros((len(thetas), len(proj_dims), num_reps))
+    leg = []
+
+    if seed is None:
+        seed = np.random.randint(2**31)
+    if shared:
+        seed_seqs = np.random.SeedSequence(seed).spawn(num_reps)
+        units = [(slice(None), r, reps, thetas, proj_dims, ambient_dim, exact,
+                  seed_seqs[r]) for r in range(num_reps)]
+    else:
+        seed_seqs = np.random.SeedSequence(seed).spawn(len(thetas) * num_reps)
+        units = [(t, r, reps, theta, proj_dims, ambient_dim, exact,
+                  seed_seqs[t * num_reps + r])
+                 for t, theta in enumerate(thetas) for r in range(num_reps)]
+
+    tic = perf_counter()
+    if num_workers == 1:
+        results = map(_comparison_unit, units)
+        _store_units(results, epsx, gnt, epsy, gnti, len(units))
+    else:
+        with ProcessPoolExecutor(num_workers, initializer=_init_worker) as ex:
+            results = ex.map(_comparison_unit, units)
+            _store_units(results, epsx, gnt, epsy, gnti, len(units))
+    trials_per_s = _trial_rate(reps, thetas, tic, exact)
+
+    for t in range(len(thetas)):
         for m in range(len(proj_dims)):
             leg.append(leg_text(t, m, thetas, proj_dims))
         # extra element at end of each row: label with value of theta
         leg.append(leg_text(t, len(proj_dims), thetas, proj_dims))
 
+    if rate:
+        return epsx, gnt, epsy, gnti, leg, trials_per_s
     return epsx, gnt, epsy, gnti, leg
 
 
+def _store_units(results, epsx: array, gnt: array, epsy: array, gnti: array,
+                 num_units: int):
+    """Put outputs of `_comparison_unit` in place, (#(th),#(M),R)"""
+    for _, (t, r, *vals) in zip(dcount('unit', num_units), results):
+        for arr, val in zip((epsx, gnt, epsy, gnti), vals):
+            arr[t, :, r] = val
+
+
 # =============================================================================
 # plotting
 # =============================================================================
@@ -370,7 +953,7 @@ def default_options():
         num_trials
             T, number of comparisons to find maximum distortion
         batch_trials
-            dT, size of chunks to perform trials into
+            dT, size of chunks to perform trials into, or None for automatic
         num_reps
             R, number of times to repeat each comparison
     ambient_dim
@@ -384,8 +967,8 @@ def default_options():
     np.random.seed(0)
     # number of samples of edge of cone
     num_trials = 2000000
-    # size of chunks to perform trials into
-    batch_trials = 100
+    # size of chunks to perform trials into, None: from memory budget
+    batch_trials = None
     # number of times to repeat each comparison
     num_reps = 5
     # combine prev 3
@@ -410,7 +993,7 @@ def quick_options():
         num_trials
             T, number of comparisons to find maximum distortion
         batch_trials
-            dT, size of chunks to perform trials into
+            dT, size of chunks to perform trials into, or None for automatic
         num_reps
             R, number of times to repeat each comparison
     ambient_dim
@@ -424,8 +1007,8 @@ def quick_options():
     np.random.seed(0)
     # number of samples of edge of cone
     num_trials = 4000
-    # size of chunks to perform trials into
-    batch_trials = 100
+    # size of chunks to perform trials into, None: from memory budget
+    batch_trials = None
     # number of times to repeat each comparison
     num_reps = 5
     # combine prev 3
@@ -449,7 +1032,10 @@ def make_and_save(filename: str,
                   reps: Tuple[int],
                   ambient_dim: int,
                   thetas: array,
-                  proj_dims: array):
+                  proj_dims: array,
+                  exact: bool = False,
+                  num_workers: Optional[int] = None,
+                  shared: bool = False):
     """
     Generate data and save in .npz file
 
@@ -461,7 +1047,7 @@ def make_and_save(filename: str,
         num_trials
             T, number of comparisons to find maximum distortion
         batch_trials
-            dT, size of chunks to perform trials into
+            dT, size of chunks to perform trials into, or None for automatic
         num_reps
             R, number of times to repeat each comparison
     ambient_dim
@@ -470,9 +1056,16 @@ def make_and_save(filename: str,
         list of angles between centre and edge of chordal cone
     proj_dims
         M, list of dimensionalities of projected space
+    exact
+        if True, compute `epsy` with `distortion_cone` instead of sampling.
+    num_workers
+        if not None, number of processes to use, see `sweep_parallel`.
+    shared
+        if True, all `thetas` share trials, see `comparison_shared`.
     """
     epsx, gnt, epsy, gnti, leg = generate_data(reps, ambient_dim, thetas,
-                                               proj_dims)
+                                               proj_dims, exact, num_workers,
+                                               shared=shared)
     np.savez_compressed(filename + '.npz', epsx=epsx, gnt=gnt, epsy=epsy,
                         gnti=gnti, leg=leg)
 
@@ -26,18 +26,18 @@ quick_options
 make_and_save
     generate data and save npz file
 """
-from typing import Sequence, Tuple
+from typing import Optional, Sequence, Tuple
 import numpy as np
 from ..iter_tricks import dbatch, denumerate
-from ..myarray import array, wrap_one, qr, singvals
+from ..myarray import (array, qr, eigvalsh, gram, cross_gram, matmul, mt,
+                       mat_distort, BufferArena, buffer)
 
 # =============================================================================
 # generate vectors
 # =============================================================================
 
 
-@wrap_one
-def make_basis(*siz: int) -> array:
+def make_basis(*siz: int, out: Optional[array] = None) -> array:
     """
     Generate orthonormal basis for central subspace
 
@@ -54,23 +54,80 @@ def make_basis(*siz: int) -> array:
         N, dimensionality of ambient space
     sub_dim
         K, dimensionality of tangent subspace
+    out ndarray (R,N,K), optional
+        array to store basis in
     """
     spaces = np.random.randn(*siz)
-    return qr(spaces)
+    return qr(spaces, out=out)
 
 
-def make_basis_perp(ambient_dim: int, sub_dim: int,
-                    *num_reps: int) -> (array, array):
+def wishart_factor(dof: int, dim: int, *siz: int) -> array:
     """
-    Generate orthonormal basis for central subspace and its orthogonal
-    complement
+    Generate random matrix whose Gram matrix is Wishart
 
     Returns
     -------
-    U_par ndarray (R,N,K)
-        basis of subspace
-    U_perp ndarray (R,N,N-K)
-        basis of orthogonal complement of subspace
+    E ndarray (...,min(dof,dim),dim)
+        :math:`E'E \\sim W_{dim}(dof, I)`. Gaussian if `dof <= dim`,
+        otherwise upper triangular from the Bartlett decomposition.
+
+    Parameters
+    ----------
+    dof
+        n, number of degrees of freedom, i.e. rows of the Gaussian matrix
+        whose Gram matrix is being sampled
+    dim
+        size of Gram matrix
+    siz
+        shape of array of matrices
+    """
+    if dof <= dim:
+        return np.random.randn(*siz, dof, dim)
+    E = np.triu(np.random.randn(*siz, dim, dim), 1)
+    diag = np.einsum('...ii->...i', E)
+    diag[...] = np.sqrt(np.random.chisquare(dof - np.arange(dim), diag.shape))
+    return E
+
+
+def tri_factor(G: array, dof: int) -> array:
+    """
+    Upper triangular factor of QR decomposition, with positive diagonal
+
+    Returns
+    -------
+    C ndarray (...,k,k)
+        upper triangular, :math:`C'C = G'G`, positive diagonal, so it only
+        depends on :math:`G'G`.
+
+    Parameters
+    ----------
+    G ndarray (...,n,k)
+        matrix to factor
+    dof
+        number of degrees of freedom in `G`, if it stands in for a larger
+        Gaussian matrix. If `dof >= 4k`, `G'G` is well conditioned and we use
+        Cholesky-QR.
+    """
+    if dof >= 4 * G.shape[-1]:
+        return mt(np.linalg.cholesky(gram(G)))
+    C = np.linalg.qr(G, mode='r')
+    C *= np.sign(np.einsum('...ii->...i', C))[..., None]
+    return C
+
+
+def make_basis_perp(ambient_dim: int, sub_dim: int, *num_reps: int,
+                    num_rows: Optional[int] = None) -> (array, array):
+    """
+    Generate orthonormal basis for central subspace, and what is needed of
+    its orthogonal complement
+
+    Returns
+    -------
+    U_par ndarray (R,P,K)
+        first `P = num_rows` rows of basis of subspace
+    U_tail ndarray (R,min(N-P,K),K)
+        :math:`U_{tail}'U_{tail} = U_{bot}'U_{bot}`, where :math:`U_{bot}`
+        are the other N-P rows of basis of subspace
 
     Parameters
     ----------
@@ -80,33 +137,65 @@ def make_basis_perp(ambient_dim: int, sub_dim: int,
         K, dimensionality of tangent subspace
     num_reps
         R, # bases to generate
+    num_rows
+        P, number of rows of basis to generate, e.g. max(M) for `distortion`.
+        If None, generate all N rows.
+
+    Notes
+    -----
+    The orthogonal complement is not stored, it is the range of the projector
+    :math:`I - U_\\parallel U_\\parallel'`, see `make_basis_other`.
+
+    :math:`U_\\parallel = Z C^{-1}`, with `Z` Gaussian and
+    :math:`C'C = Z'Z = Z_{top}'Z_{top} + Z_{bot}'Z_{bot}`. The last term is
+    Wishart, so the other N-P rows of `Z` never need to be generated.
     """
-    U = make_basis(*num_reps, ambient_dim, ambient_dim)
-    return U[..., 0:sub_dim], U[..., sub_dim:]
+    rows = ambient_dim if num_rows is None else num_rows
+    Z_top = np.random.randn(*num_reps, rows, sub_dim)
+    Z_tail = wishart_factor(ambient_dim - rows, sub_dim, *num_reps)
+    C_inv = np.linalg.inv(tri_factor(np.concatenate((Z_top, Z_tail), -2),
+                                     ambient_dim))
+    return matmul(Z_top, C_inv), matmul(Z_tail, C_inv)
 
 
 def make_basis_other(U_par: array,
-                     U_perp: array,
+                     U_tail: array,
                      theta_max: float,
-                     *num_trials: int) -> array:
+                     *num_trials: int,
+                     arena: Optional[BufferArena] = None,
+                     ambient_dim: Optional[int] = None,
+                     num_tail: int = 0) -> array:
     """
     Generate orthonormal basis for another subspace on edge of cone T
 
     Returns
     -------
-    U' ndarray (T,R,N,K)
-        basis of subspace on edge of T
+    U' ndarray (T,R,P,K)
+        first `P` rows of basis of subspace on edge of T.
+        Stored in `arena`, if given, so it is overwritten by the next call.
+    U'_tail ndarray (num_tail,R,min(N-P,K),K)
+        components of the other rows of `U'` along those of `U_par`, in the
+        basis where they are `U_tail`, for the first `num_tail` trials.
+        Only returned if `num_tail > 0`.
 
     Parameters
     ----------
-    U_par ndarray (R,N,K)
-        basis of subspace
-    U_perp ndarray (R,N,N-K)
-        basis of orthogonal complement of subspace
+    U_par ndarray (R,P,K)
+        first `P` rows of basis of subspace, see `make_basis_perp`
+    U_tail ndarray (R,min(N-P,K),K)
+        factor of Gram matrix of the other rows, see `make_basis_perp`
     theta_max
         max principal angle between U_par and U'
     num_trials
         T, # bases to generate
+    arena
+        store of work arrays, reused when called in a loop
+    ambient_dim
+        N, dimensionality of ambient space. If None, `P`, i.e. `U_par` is
+        the whole basis.
+    num_tail
+        number of trials for which to also return `U'_tail`, so that
+        `max_pang` can use whole bases.
 
     Notes
     -----
@@ -125,20 +214,125 @@ def make_basis_other(U_par: array,
     We set :math:`\\theta_1 = \\theta_\\max` and independently sample
     :math:`\\theta_{a>1}` uniformly in `[0,\\theta_\\max]`
     (not the Harr measure)
+
+    :math:`U_\\perp S_\\perp = X C^{-1}`, where
+    :math:`X = (I - U_\\parallel U_\\parallel') G`, with `G` Gaussian, and
+    :math:`C'C = X'X`. In a basis whose first `P` directions are the
+    projected ones, and the next ones span the rest of :math:`U_\\parallel`,
+    the remaining rows of `G` are only needed through their Gram matrix, see
+    `wishart_factor`. So neither :math:`U_\\perp` nor the other N-P rows of
+    anything are generated.
+    """
+    parts = make_basis_parts(U_par, U_tail, *num_trials, arena=arena,
+                             ambient_dim=ambient_dim, num_tail=num_tail)
+    return mix_basis(theta_max, *parts, arena=arena)
+
+
+def make_basis_parts(U_par: array,
+                     U_tail: array,
+                     *num_trials: int,
+                     arena: Optional[BufferArena] = None,
+                     ambient_dim: Optional[int] = None,
+                     num_tail: int = 0) -> (array, array, array, array,
+                                            Optional[Tuple[array, array]]):
     """
-    m = min(U_par.shape[-1], U_perp.shape[-1])
+    Generate the parts of bases on edge of cone T that do not depend on the
+    size of the cone, see `make_basis_other`
+
+    Returns
+    -------
+    ratio ndarray (T,R,1,L)
+        principal angles divided by `theta_max`, first one is 1.
+    U_cos ndarray (T,R,P,L)
+        :math:`U_\\parallel S_\\parallel`, first `P` rows.
+    U_sin ndarray (T,R,P,L)
+        :math:`U_\\perp S_\\perp`, first `P` rows.
+    R ndarray (T,R,K,L)
+        rotation within U'.
+    tails (ndarray (num_tail,R,min(N-P,K),L), same)
+        the other rows of `U_cos` and `U_sin`, along those of `U_par`, for
+        the first `num_tail` trials. None if `num_tail == 0`.
+    All but `tails` are stored in `arena`, if given.
+
+    Parameters
+    ----------
+    U_par, U_tail, num_trials, arena, ambient_dim, num_tail
+        see `make_basis_other`.
+    """
+    rows, K = U_par.shape[-2:]
+    N = rows if ambient_dim is None else ambient_dim
+    m = min(K, N - K)
     count = num_trials + U_par.shape[:-2]
-    theta = np.random.rand(*count, 1, m)
-    theta[..., 0] = 1.
-    theta *= theta_max
-    costh = np.cos(theta)
-    sinth = np.sin(theta)
+    ratio = np.random.rand(*count, 1, m)
+    ratio[..., 0] = 1.
+
+    S_par = make_basis(*count, K, m,
+                       out=buffer(arena, 'S_par', count + (K, m)))
+    R = make_basis(*count, K, m, out=buffer(arena, 'R', count + (K, m)))
+
+    # G: first rows, rows along U_tail, rest (only via its Gram matrix)
+    top = rows + U_tail.shape[-2]
+    G_rest = wishart_factor(N - top, m, *count)
+    G = buffer(arena, 'G', count + (top + G_rest.shape[-2], m))
+    G[..., :top, :] = np.random.randn(*count, top, m)
+    G[..., top:, :] = G_rest
+    G_top, G_tail = G[..., :rows, :], G[..., rows:top, :]
+    # X = (I - U_par U_par') G
+    UG = cross_gram(U_par, G_top) + cross_gram(U_tail, G_tail)
+    G_top -= matmul(U_par, UG)
+    G_tail -= matmul(U_tail, UG)
+    C_inv = np.linalg.inv(tri_factor(G, N - K))
+
+    U_cos = matmul(U_par, S_par, out=buffer(arena, 'U_cos', count + (rows, m)))
+    U_sin = matmul(G_top, C_inv, out=buffer(arena, 'U_sin', count + (rows, m)))
+    if not num_tail:
+        return ratio, U_cos, U_sin, R, None
+    # the rest of G was orthogonal to U_par, so it does not contribute
+    trials = np.s_[:num_tail]
+    tails = (matmul(U_tail, S_par[trials]),
+             matmul(G_tail[trials], C_inv[trials]))
+    return ratio, U_cos, U_sin, R, tails
+
+
+def mix_basis(theta_max: float,
+              ratio: array,
+              U_cos: array,
+              U_sin: array,
+              R: array,
+              tails: Optional[Tuple[array, array]] = None,
+              arena: Optional[BufferArena] = None) -> array:
+    """
+    Combine parts from `make_basis_parts` into bases on edge of cone T
 
-    S_par = make_basis(*count, U_par.shape[-1], m)
-    S_perp = make_basis(*count, U_perp.shape[-1], m)
-    R = make_basis(*count, U_par.shape[-1], m)
+    Returns
+    -------
+    U', U'_tail
+        see `make_basis_other`. `U'` is stored in `arena`, if given.
 
-    return (U_par @ S_par * costh + U_perp @ S_perp * sinth) @ R.t
+    Parameters
+    ----------
+    theta_max
+        max principal angle between U_par and U'
+    ratio, U_cos, U_sin, R, tails
+        output of `make_basis_parts`, unchanged by this function, so they can
+        be reused for other values of `theta_max`.
+    arena
+        store of work arrays, reused when called in a loop
+    """
+    theta = ratio * theta_max
+    costh = np.cos(theta)
+    sinth = np.sin(theta)
+    # (U_par @ S_par * costh + U_perp @ S_perp * sinth) @ R^T
+    U_mix = np.multiply(U_cos, costh, out=buffer(arena, 'U_mix', U_cos.shape))
+    U_tmp = np.multiply(U_sin, sinth, out=buffer(arena, 'U_tmp', U_sin.shape))
+    U_mix += U_tmp
+    shape = U_cos.shape[:-1] + R.shape[-2:-1]
+    U_other = matmul(U_mix, mt(R), out=buffer(arena, 'U_other', shape))
+    if tails is None:
+        return U_other
+    trials = np.s_[:len(tails[0])]
+    U_mix = tails[0] * costh[trials] + tails[1] * sinth[trials]
+    return U_other, matmul(U_mix, mt(R[trials]))
 
 
 # =============================================================================
@@ -189,30 +383,45 @@ def guarantee(distort: float,
     return distort - (ambient_dim / proj_dim) * np.sin(theta)
 
 
-def max_pang(U1: array, U2: array):  # sine of largest principal angle
+def max_pang(U1: array, U2: array,  # sine of largest principal angle
+             U1_tail: Optional[array] = None,
+             U2_tail: Optional[array] = None):
     """
     Sine of largest principal angle between spaces spanned bu `U1` and `U2`
 
     Parameters
     ----------
     U!, U2 ndarray (R,N,K), (T,R,N,K)
-        basis of subspace
+        basis of subspace, or its first `P` rows
+    U1_tail, U2_tail ndarray (R,L,K), (T,R,L,K), optional
+        the rest of the bases, in a basis of `L` directions that contains the
+        rest of `U1`, see `make_basis_perp` and `make_basis_other`.
 
     Returns
     -------
     sin(theta) ndarray (T,R)
+
+    Notes
+    -----
+    Uses the smallest eigenvalue of the Gram matrix of the overlap, rather
+    than its singular values, as the symmetric eigensolver is much faster for
+    these small matrices.
     """
-    gram = U1.T @ U2  # (T,R,K,K)
-    sv = singvals(gram)  # (T,R,K)
-    sines = np.sqrt(1. - sv**2)
-    return np.amax(sines, axis=-1)  # (T,R)
+    overlap = cross_gram(U1, U2)  # (T,R,K,K)
+    if U1_tail is not None:
+        overlap += cross_gram(U1_tail, U2_tail)
+    cos_sq = eigvalsh(gram(overlap))  # (T,R,K)
+    return np.sqrt(np.clip(1. - np.amin(cos_sq, axis=-1), 0., 1.))  # (T,R)
+
 
 # =============================================================================
 # calculate distortion
 # =============================================================================
 
 
-def distortion(space: array, proj_dims: array) -> float:
+def distortion(space: array, proj_dims: array,
+               arena: Optional[BufferArena] = None,
+               ambient_dim: Optional[int] = None) -> float:
     """distortion of vec under projection
 
     Distortion of subspace under projection.
@@ -225,18 +434,31 @@ def distortion(space: array, proj_dims: array) -> float:
         orthonormal basis for subspace
     proj_dims ndarray (#(M),)
         M, dimensionality of projected space
+    arena
+        store of work arrays, reused when called in a loop
+    ambient_dim
+        N, dimensionality of ambient space. If None, `space.shape[-2]`.
+        Needed if `space` only has its first max(M) rows.
 
     Returns
     -------
     eps ndarray (#(M),R)
-     """
-    axs = tuple(range(proj_dims.ndim, proj_dims.ndim + space.ndim - 3)) + (-1,)
-    N = space.shape[-2]
-    dist = np.empty(proj_dims.shape + space.shape[:-2] + space.shape[-1:])
-    for m, M in enumerate(proj_dims):
-        sv = singvals(space[..., 0:M, :])  # (#(M),dT,R,K)
-        dist[m] = np.abs(np.sqrt(N / M) * sv - 1.)  # (#(M),dT,R,K)
-    return np.amax(dist, axis=axs)  # (#(M),R)
+        distortion of subspace under projection, maximised over trials
+
+    Notes
+    -----
+    The singular values for all M come from running sums of the Gram matrix
+    of the rows, and the maximum over trials and singular values is taken in
+    the same loop, see `mat_distort`. No `(#(M),dT,R,K)` array is formed.
+    """
+    if ambient_dim is not None and ambient_dim != space.shape[-2]:
+        # mat_distort takes N from the length of space, rescale to get N / M
+        space = np.multiply(space, np.sqrt(ambient_dim / space.shape[-2]),
+                            out=buffer(arena, 'scaled', space.shape))
+    # (dT,R,N,K) -> (R,dT,N,K), trials become a core dimension of the gufunc
+    trials = space.reshape((-1,) + space.shape[-3:]).swapaxes(0, 1)
+    # (R,#(M)) -> (#(M),R)
+    return mat_distort(trials, proj_dims).T
 
 
 # =============================================================================
@@ -248,7 +470,9 @@ def comparison(reps: Sequence[int],
                theta: float,
                sub_dim: int,
                proj_dims: array,
-               ambient_dim: int) -> (float, float, float, float):
+               ambient_dim: int,
+               pang_bins: Optional[array] = None,
+               pang_trials: int = 10) -> (float, float, float, float):
     """comparison of theory and experiment
 
     Comparison of theory and experiment
@@ -272,6 +496,10 @@ def comparison(reps: Sequence[int],
         maximum distortion of U' for U' in tangential cone
     gnti ndarray (#(M),R)
         guarantee(gnti) = distortion of central subspace U
+    pang ndarray (#(bins)-1,)
+        histogram of largest principal angle between U and U', for checking
+        that U' is on the edge of the cone, from the first `pang_trials` of
+        each batch. Only returned if `pang_bins`.
 
     Parameters
     ----------
@@ -290,17 +518,96 @@ def comparison(reps: Sequence[int],
         M, dimensionality of projected space
     ambient_dim
         N, dimensionality of ambient space
+    pang_bins ndarray (#(bins),), optional
+        edges of bins for histogram of largest principal angle, see `max_pang`
+    pang_trials
+        number of trials in each batch to put in the histogram. Checking them
+        all would cost ~20% extra, the default ~1%.
     """
     (num_trials, batch_trials, num_reps) = reps
 
-    U_par, U_perp = make_basis_perp(ambient_dim, sub_dim, num_reps)
-    epsilon = distortion(U_par, proj_dims)  # (#(M),R)
+    U_par, U_tail = make_basis_perp(ambient_dim, sub_dim, num_reps,
+                                    num_rows=proj_dims.max())
+    epsilon = distortion(U_par, proj_dims, ambient_dim=ambient_dim)  # (#(M),R)
     epsilonb = np.zeros_like(epsilon)  # (#(M),R)
+    # work arrays, allocated on first batch
+    arena = BufferArena()
+
+    if pang_bins is not None:
+        pang = np.zeros(len(pang_bins) - 1, dtype=int)
 
     for i in dbatch('trial', 0, num_trials, batch_trials):
-        U2 = make_basis_other(U_par, U_perp, theta, batch_trials)
-        np.maximum(epsilonb, distortion(U2, proj_dims), out=epsilonb)
+        if pang_bins is None:
+            U2 = make_basis_other(U_par, U_tail, theta, batch_trials,
+                                  arena=arena, ambient_dim=ambient_dim)
+        else:
+            U2, U2_tail = make_basis_other(U_par, U_tail, theta, batch_trials,
+                                           arena=arena, num_tail=pang_trials,
+                                           ambient_dim=ambient_dim)
+            sines = max_pang(U_par, U2[:pang_trials], U_tail, U2_tail)
+            pang += np.histogram(np.arcsin(sines), pang_bins)[0]
+        np.maximum(epsilonb, distortion(U2, proj_dims, arena, ambient_dim),
+                   out=epsilonb)
+
+    gnt = guarantee(epsilonb, theta, proj_dims[..., None], ambient_dim)
+    gnti = guarantee_inv(epsilon, theta, proj_dims[..., None], ambient_dim)
+
+    if pang_bins is not None:
+        return epsilon, gnt, epsilonb, gnti, pang
+    return epsilon, gnt, epsilonb, gnti
+
+
+def comparison_shared(reps: Sequence[int],
+                      thetas: array,
+                      sub_dim: int,
+                      proj_dims: array,
+                      ambient_dim: int) -> (array, array, array, array):
+    """comparison of theory and experiment, for all thetas at once
+
+    Like `comparison`, but all `thetas` use the same `U` and the same random
+    factors for the trials, see `make_basis_parts`. Only `mix_basis` and
+    `distortion` are repeated for each theta.
+
+    Returns
+    -------
+    epsilon ndarray (#(th),#(M),R)
+        distortion of central subspace U
+    gnt ndarray (#(th),#(M),R)
+        guarantee(maximum distortion of U' for U' in tangential cone
+    epsilonb ndarray (#(th),#(M),R)
+        maximum distortion of U' for U' in tangential cone
+    gnti ndarray (#(th),#(M),R)
+        guarantee(gnti) = distortion of central subspace U
 
+    Parameters
+    ----------
+    reps, sub_dim, proj_dims, ambient_dim
+        see `comparison`.
+    thetas ndarray (#(th),)
+        max principal angles between centre and edge of chordal cone
+    """
+    (num_trials, batch_trials, num_reps) = reps
+    thetas = np.asarray(thetas)
+    out_shape = thetas.shape + proj_dims.shape + (num_reps,)
+
+    U_par, U_tail = make_basis_perp(ambient_dim, sub_dim, num_reps,
+                                    num_rows=proj_dims.max())
+    epsilon = np.empty(out_shape)
+    epsilon[...] = distortion(U_par, proj_dims, ambient_dim=ambient_dim)
+    epsilonb = np.zeros(out_shape)
+    # work arrays, allocated on first batch
+    arena = BufferArena()
+
+    for i in dbatch('trial', 0, num_trials, batch_trials):
+        parts = make_basis_parts(U_par, U_tail, batch_trials, arena=arena,
+                                 ambient_dim=ambient_dim)
+        for t, theta in enumerate(thetas):
+            U2 = mix_basis(theta, *parts, arena=arena)
+            np.maximum(epsilonb[t],
+                       distortion(U2, proj_dims, arena, ambient_dim),
+                       out=epsilonb[t])
+
+    theta = thetas[..., None, None]
     gnt = guarantee(epsilonb, theta, proj_dims[..., None], ambient_dim)
     gnti = guarantee_inv(epsilon, theta, proj_dims[..., None], ambient_dim)
 
@@ -311,7 +618,9 @@ def generate_data(reps: Sequence[int],
                   amb_dim: int,
                   thetas: array,
                   sub_dims: array,
-                  proj_dims: array) -> (array, array, array, array):
+                  proj_dims: array,
+                  pang_bins: Optional[array] = None,
+                  shared: bool = False) -> (array, array, array, array):
     """
     Generate all data for plots and legend
     Compute disortion of central subspace and subspaces at edges of cone that
@@ -336,6 +645,9 @@ def generate_data(reps: Sequence[int],
         guarantee(gnti) = distortion of central subspace U
     leg
         legend text associated with corresponding datum
+    pang ndarray (#(th),#(K),#(bins)-1)
+        histogram of largest principal angle between U and U'.
+        Only returned if `pang_bins`.
 
     Parameters
     ----------
@@ -354,20 +666,46 @@ def generate_data(reps: Sequence[int],
         K, list of dimensionalities of subspace
     proj_dims ndarray (#(M),)
         M, set of dimensionalities of projected space
+    pang_bins ndarray (#(bins),), optional
+        edges of bins for histogram of largest principal angle, see `max_pang`
+    shared
+        if True, all `thetas` use the same `U` and random factors of `U'`,
+        see `comparison_shared`. Cannot be used with `pang_bins`.
     """
+    if shared and pang_bins is not None:
+        raise ValueError('pang_bins cannot be used with shared.')
     eps = np.zeros((len(thetas), len(sub_dims), len(proj_dims), reps[2]))
     gnt = np.zeros((len(thetas), len(sub_dims), len(proj_dims), reps[2]))
     epsb = np.zeros((len(thetas), len(sub_dims), len(proj_dims), reps[2]))
     gnti = np.zeros((len(thetas), len(sub_dims), len(proj_dims), reps[2]))
+    if pang_bins is not None:
+        pang = np.zeros((len(thetas), len(sub_dims), len(pang_bins) - 1),
+                        dtype=int)
     leg = []
 
-    for t, theta in denumerate('theta', thetas):
+    if shared:
         for k, K in denumerate('K', sub_dims):
-            ind = (t, k)
-            (eps[ind],
-             gnt[ind],
-             epsb[ind],
-             gnti[ind]) = comparison(reps, theta, K, proj_dims, amb_dim)
+            (eps[:, k],
+             gnt[:, k],
+             epsb[:, k],
+             gnti[:, k]) = comparison_shared(reps, thetas, K, proj_dims,
+                                             amb_dim)
+
+    else:
+        for t, theta in denumerate('theta', thetas):
+            for k, K in denumerate('K', sub_dims):
+                ind = (t, k)
+                out = comparison(reps, theta, K, proj_dims, amb_dim,
+                                 pang_bins)
+                (eps[ind],
+                 gnt[ind],
+                 epsb[ind],
+                 gnti[ind]) = out[:4]
+                if pang_bins is not None:
+                    pang[ind] = out[4]
+
+    for t in range(len(thetas)):
+        for k in range(len(sub_dims)):
             for m in range(len(proj_dims)):
                 leg.append(leg_text(t, k, m, thetas, sub_dims, proj_dims))
             # extra element at end of each row: label with value of M
@@ -377,6 +715,8 @@ def generate_data(reps: Sequence[int],
         leg.append(leg_text(t, len(sub_dims), len(proj_dims), thetas, sub_dims,
                             proj_dims))
 
+    if pang_bins is not None:
+        return eps, gnt, epsb, gnti, leg, pang
     return eps, gnt, epsb, gnti, leg
 
 
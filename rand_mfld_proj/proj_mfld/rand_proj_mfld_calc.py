@@ -19,11 +19,11 @@ distortion_m
     Maximum distortion of all chords between points on the manifold,
     sampling projectors, for each V, M
 """
-from typing import Sequence, Tuple, List, Mapping
+from typing import Sequence, Tuple, List, Mapping, Optional
 from numbers import Real
 import numpy as np
 
-from ..myarray import array, pdist_ratio, cdist_ratio
+from ..myarray import array, pdist_ratio, cdist_ratio, BufferArena
 from ..iter_tricks import dbatch, denumerate, rdenumerate
 from ..mfld.gauss_mfld import SubmanifoldFTbundle
 from . import rand_proj_mfld_util as ru
@@ -38,7 +38,8 @@ Inds = Tuple[Nind, Pind]
 
 
 def region_inds_list(shape: Sequence[int],
-                     mfld_fs: Sequence[float]) -> List[List[Inds]]:
+                     mfld_fs: Sequence[float],
+                     points: Optional[array] = None) -> List[List[Inds]]:
     """
     List of index sets for different sized regions, each index set being the
     indices of condensed matrix returned by pdist corresponding to the
@@ -50,6 +51,10 @@ def region_inds_list(shape: Sequence[int],
         tuple of nujmber of points along each dimension (max(K),)
     mfld_fs
         list of fractions of manifold to keep (#(V))
+    points
+        (optional) intrinsic coordinates of scattered points, in units of the
+        range of intrinsic coords, (L,max(K)), see `ru.slice_points`.
+        If given, `shape` is ignored and points are selected by coordinates.
 
     Returns
     -------
@@ -62,11 +67,15 @@ def region_inds_list(shape: Sequence[int],
     # new indices, & those seen before, for each f, K
     region_inds = []
     # all indices for previous f, for all K
-    prev_fs = [np.array([], int) for i in range(len(shape))]
+    num_dim = len(shape) if points is None else points.shape[-1]
+    prev_fs = [np.array([], int) for i in range(num_dim)]
     # loop over f
     for frac in mfld_fs:
         # all indices, for this f, for all K
-        all_inds = ru.region_indices(shape, frac)
+        if points is None:
+            all_inds = ru.region_indices(shape, frac)
+        else:
+            all_inds = ru.region_indices_points(points, frac)
         # arrays to store new & previous for this f, all K
         ind_arrays = []
         # all indices, for new f, for previous K
@@ -95,7 +104,8 @@ def region_inds_list(shape: Sequence[int],
 # =============================================================================
 
 
-def distortion(vecs: array, pvecs: array, inds: Inds) -> array:
+def distortion(vecs: array, pvecs: array, inds: Inds,
+               ambient_dim: Optional[int] = None) -> array:
     """Distortion of a chord
 
     Parameters
@@ -109,24 +119,30 @@ def distortion(vecs: array, pvecs: array, inds: Inds) -> array:
         subregions (2,), each element an array of indices of shape
         ((fL)^K - #(prev),) or (#(prev),),
         where: #(prev) = (fL)^K-1 + (f'L)^K - (f'L)^K-1
+    ambient_dim : Optional[int]
+        N, dimensionality of ambient space, if `vecs` have been rotated into
+        a different number of dimensions. Default: `vecs.shape[-1]`.
 
     Returns
     -------
     distortion : array (S,)
         maximum distortion of chords
     """
-    scale = np.sqrt(vecs.shape[-1] / pvecs.shape[-1])
+    if ambient_dim is None:
+        ambient_dim = vecs.shape[-1]
+    scale = np.sqrt(ambient_dim / pvecs.shape[-1])
     distn = np.zeros(pvecs.shape[:1])  # (S,)
     ninds, pinds = inds
-    if len(ninds) > 0:
+    # pdist_ratio of one point has no chords, it returns (inf, 0)
+    if len(ninds) > 1:
         # (S, 2)
         lratio = np.stack(pdist_ratio(pvecs[:, ninds], vecs[ninds]), axis=-1)
         # use fmax to ignore NaN, (S,)
         distn = np.fmax(distn, np.abs(scale * lratio - 1.).max(axis=-1))
-        if len(pinds) > 0:
-            lratio = np.stack(cdist_ratio(pvecs[:, ninds], pvecs[:, pinds],
-                                          vecs[ninds], vecs[pinds]), axis=-1)
-            distn = np.fmax(distn, np.abs(scale * lratio - 1.).max(axis=-1))
+    if len(ninds) > 0 and len(pinds) > 0:
+        lratio = np.stack(cdist_ratio(pvecs[:, ninds], pvecs[:, pinds],
+                                      vecs[ninds], vecs[pinds]), axis=-1)
+        distn = np.fmax(distn, np.abs(scale * lratio - 1.).max(axis=-1))
     return distn
 
 
@@ -174,15 +190,19 @@ def distortion_v(mfld: SubmanifoldFTbundle,
 
     for v, inds in denumerate('Vol', region_inds):
         for k, gdn, pts in denumerate('K', gdistn, inds):
-            distn[k, v] = gdn[:, pts[0]].max(axis=-1)  # (S,)
+            distn[k, v] = gdn[:, pts[0]].max(axis=-1, initial=0.)  # (S,)
             np.maximum(distn[k, v],
-                       distortion(mfld.mfld, proj_mflds.mfld, pts),
+                       distortion(mfld.mfld, proj_mflds.mfld, pts,
+                                  mfld.ambient),
                        out=distn[k, v])
 
     # because each entry in region_inds  only contains new points
     np.maximum.accumulate(distn, axis=0, out=distn)  # (#(K),#(V),S)
     np.maximum.accumulate(distn, axis=1, out=distn)  # (#(K),#(V),S)
 
+    if not np.isfinite(distn).all():
+        # np.quantile would turn these into NaN
+        raise ValueError('Infinite distortion, are there coincident points?')
     return distn
 
 
@@ -231,10 +251,12 @@ def distortion_m(mfld: SubmanifoldFTbundle,
                       len(proj_dims), uni_opts['samples']))
 
     batch = uni_opts['batch']
+    # work arrays for projections, allocated on first batch
+    arena = BufferArena()
     for s in dbatch('Sample', 0, uni_opts['samples'], batch):
         # projected manifold for each sampled proj, (S,Lx*Ly...,max(M))
         # gauss map of projected mfold for each proj, (#K,)(S,L,K,max(M))
-        pmflds = ru.project_mfld(mfld, proj_dims[-1], batch)
+        pmflds = ru.project_mfld(mfld, proj_dims[-1], batch, arena)
 
         # loop over M
         for m, M in rdenumerate('M', proj_dims):
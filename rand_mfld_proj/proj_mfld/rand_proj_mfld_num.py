@@ -17,21 +17,23 @@ default_options
     default options for long numerics for paper
 quick_options
     default options for quick numerics for demo
+scattered_options
+    options for numerics with K > 2, on scattered points
 make_and_save
     generate data and save npz file
 """
-from typing import Sequence, Tuple, Mapping, Dict
+from typing import Dict, Iterator, List, Mapping, Sequence, Tuple
 from numbers import Real
 import numpy as np
 from numpy import ndarray as array
 
 from ..mfld import gauss_mfld as gm
-from ..iter_tricks import dcontext, rdenumerate
+from ..iter_tricks import dbatch, dcontext, rdenumerate
 from . import rand_proj_mfld_calc as rc
 from . import rand_proj_mfld_util as ru
 
 
-# K hard coded in: Options
+# K hard coded in: default_options, quick_options
 # =============================================================================
 # %%* generate manifold
 # =============================================================================
@@ -57,6 +59,15 @@ def make_surf(ambient_dim: int,
             tuple for (varying N, varying V)
         lambda
             tuple of std devs of gauss cov along each intrinsic axis, (max(K),)
+        feat
+            (optional) number of random Fourier features. If given, the
+            points that are kept are sampled directly, see
+            `gauss_mfld.features_bundle`, rather than by FFT on a grid that
+            is `expand` times larger.
+        points
+            (optional) tuple of numbers of scattered points in each k-d
+            slice, (max(K),). If given, these points are used instead of a
+            grid, see `rand_proj_mfld_util.slice_points`. Implies `feat`.
     expand
         max(Lx)/Lx = max(Ly)/Ly, integer > 1
         1 / fraction of ranges of intrinsic coords to keep
@@ -69,6 +80,20 @@ def make_surf(ambient_dim: int,
         grad
             grad[s,t,i,a] = phi_a^i(x[s], y[t])
     """
+    if mfld_info.get('points'):
+        # scattered intrinsic coords of points kept, (L,K)
+        points = ru.slice_points(mfld_info['points']) * mfld_info['L']
+    elif mfld_info.get('feat'):
+        # intrinsic coords of points kept, same spacing as grid, (Lx,Ly,K)
+        coords = [np.arange(lng) * 2. * rng / lng
+                  for rng, lng in zip(mfld_info['L'], mfld_info['num'])]
+        points = np.stack(np.meshgrid(*coords, indexing='ij'), axis=-1)
+    else:
+        points = None
+    if points is not None:
+        features = gm.random_features(ambient_dim, mfld_info['lambda'],
+                                      mfld_info.get('feat', 1024))
+        return gm.features_bundle(points, *features)
     # Spatial frequencies used
     kvecs = gm.spatial_freq(mfld_info['L'], mfld_info['num'], expand)
     # Fourier transform of embedding functions, (N,Lx,Ly/2)
@@ -81,7 +106,8 @@ def make_surf(ambient_dim: int,
     mfld.calc_grad()
     # which elements to remove to select central region
     remove = [(expand - 1) * lng // 2 for lng in mfld_info['num']]
-    keep = tuple(slice(rm, -rm) for rm in remove)
+    keep = tuple(slice(rm, rm + lng)
+                 for rm, lng in zip(remove, mfld_info['num']))
     # throw out side regions, to lessen effects of periodicity
     mfld.mfld = mfld.mfld[keep]
     mfld.grad = mfld.grad[keep]
@@ -90,6 +116,53 @@ def make_surf(ambient_dim: int,
     return mfld
 
 
+def make_surf_blocks(ambient_dims: Sequence[int],
+                     mfld_info: Mapping[str, Sequence[Real]],
+                     block: int,
+                     expand: int = 2) -> Iterator[gm.SubmanifoldFTbundle]:
+    """
+    Make random surface, in blocks of ambient dimensions
+
+    The ambient components are independent, so each block is a random
+    surface in its own right, see `make_surf`, rescaled to the normalisation
+    of the whole surface.
+
+    Parameters
+    ----------
+    ambient_dims
+        N, increasing numbers of ambient dimensions, (#(N),).
+        Blocks stop at each of these.
+    mfld_info
+        dict of parameters for manifold sampling, see `make_surf`.
+    block
+        maximum number of ambient dimensions in each block
+    expand
+        max(Lx)/Lx = max(Ly)/Ly, integer > 1
+        1 / fraction of ranges of intrinsic coords to keep
+
+    Yields
+    ------
+    mfld: SubmanifoldFTbundle
+        mfld[st...,i]
+            phi^i(x[s],y[t]) (L,Nb) Embedding fcns of random surface
+        grad
+            grad[st...,i,a] = phi_a^i(x[s], y[t]), (L,Nb,K)
+        with location indices flattened.
+    """
+    start = 0
+    for stop in ambient_dims:
+        for first in range(start, stop, block):
+            num = min(block, stop - first)
+            mfld = make_surf(num, mfld_info, expand)
+            mfld.flattish()
+            # make_surf normalises by number of ambient dimensions
+            scale = np.sqrt(num / ambient_dims[-1])
+            mfld.mfld *= scale
+            mfld.grad *= scale
+            yield mfld
+        start = stop
+
+
 # =============================================================================
 # %%* distortion calculations
 # =============================================================================
@@ -195,6 +268,57 @@ def reqd_proj_dim(mfld: gm.SubmanifoldFTbundle,
 
     return reqd_m, eps
 
+
+def distortions_stream(region_inds: Sequence[Sequence[rc.Inds]],
+                       param_ranges: Mapping[str, array],
+                       uni_opts: Mapping[str, Real],
+                       mfld_info: Mapping[str, Sequence[Real]]
+                       ) -> List[array]:
+    """
+    Maximum distortion of all chords between points on the manifold,
+    sampling projectors, for each N, V, M, never storing the whole manifold
+
+    Parameters
+    ----------
+    region_inds
+        list of lists of tuples of arrays containing indices of points etc.
+    param_ranges
+        dict of parameter ranges, see `get_num_cmb`.
+    uni_opts
+        dict of scalar options, see `get_num_cmb`. Uses `stream`, the number
+        of ambient dimensions in each block.
+    mfld_info
+        dict of parameters for manifold sampling, see `make_surf`.
+
+    Returns
+    -------
+    distortions
+        list of max distortion of chords for each N, (#(N),)(#(K),#(V),#(M),S)
+
+    Notes
+    -----
+    The manifold is regenerated, one block of ambient dimensions at a time,
+    for each batch of samples, from the same state of the random number
+    generator. The projections use a separate one.
+    """
+    Ns, batch = param_ranges['N'], uni_opts['batch']
+    all_Ms = [param_ranges['M'][param_ranges['M'] <= N] for N in Ns]
+    distns = [np.empty((len(region_inds[0]), len(region_inds), len(Ms),
+                        uni_opts['samples'])) for Ms in all_Ms]
+    rng = np.random.default_rng(np.random.randint(2**31))
+    state = np.random.get_state()
+    for s in dbatch('Sample', 0, uni_opts['samples'], batch):
+        # same manifold for each batch
+        np.random.set_state(state)
+        blocks = make_surf_blocks(Ns, mfld_info, uni_opts['stream'])
+        projected = ru.project_mfld_blocks(blocks, Ns, param_ranges['M'][-1],
+                                           batch, rng)
+        for distn, Ms, (mfld, pmflds) in zip(distns, all_Ms, projected):
+            for m, M in rdenumerate('M', Ms):
+                distn[..., m, s] = rc.distortion_v(mfld, pmflds.sel_ambient(M),
+                                                   region_inds)
+    return distns
+
 # =============================================================================
 # %%* numeric data
 # =============================================================================
@@ -231,6 +355,10 @@ def get_num_cmb(param_ranges: Mapping[str, array],
         chunk
             chords are processed (vectorised) in chunks of this length.
             The different chunks are looped over (mem version).
+        stream
+            (optional) if given, the manifold is generated and projected in
+            blocks of this many ambient dimensions, and never stored whole,
+            see `rand_proj_mfld_util.project_mfld_blocks`.
     mfld_info
             dict of parameters for manifold sampling, with fields:
         num
@@ -262,14 +390,29 @@ def get_num_cmb(param_ranges: Mapping[str, array],
                for k in range(1, 1+len(mfld_info['L']))]
     vols = 2 * np.array(max_vol)[..., None] * param_ranges['Vfr']
 
+    with dcontext('inds'):
+        # indices for regions we keep
+        points = None
+        if mfld_info.get('points'):
+            points = ru.slice_points(mfld_info['points'])
+        region_inds = rc.region_inds_list(mfld_info.get('num', ()),
+                                          param_ranges['Vfr'], points)
+
+    if uni_opts.get('stream'):
+        # generate and project manifold in blocks of ambient dimensions
+        distortions = distortions_stream(region_inds, param_ranges, uni_opts,
+                                         mfld_info)
+        for i, (N, dists) in enumerate(zip(param_ranges['N'], distortions)):
+            Ms = param_ranges['M'][param_ranges['M'] <= N]
+            distn[..., i] = np.quantile(dists, 1. - uni_opts['prob'], axis=-1)
+            proj_req[..., i] = calc_reqd_m(param_ranges['eps'], Ms,
+                                           distn[..., i])
+        return proj_req, distn, vols
+
     # generate manifold
     with dcontext('mfld'):
         mfld = make_surf(param_ranges['N'][-1], mfld_info)
 
-    with dcontext('inds'):
-        # indices for regions we keep
-        region_inds = rc.region_inds_list(mfld.shape[:-1], param_ranges['Vfr'])
-
     with dcontext('flatten'):
         # flatten location indices, put ambient index last
         mfld.flattish()
@@ -476,6 +619,76 @@ def quick_options() -> (Dict[str, array],
 
     return param_ranges, uni_opts, mfld_info
 
+
+def scattered_options(num_dim: int = 3) -> (Dict[str, array],
+                                            Dict[str, Real],
+                                            Dict[str, Tuple[Real, ...]]):
+    """
+    Options for generating data for higher dimensional manifolds, using
+    scattered points in slices rather than a grid
+
+    Parameters
+    ----------
+    num_dim
+        max(K), maximum intrinsic dimensionality, up to 4
+
+    Returns
+    -------
+    param_ranges
+            dict of parameter ranges, with fields:
+        epsilons : array (#(e),)
+            ndarray of allowed distortions
+        proj_dims : array (#(M),)
+            ndarray of M's, dimensionalities of projected space,
+        ambient_dims : array (#(N),)
+            ndarray of N's, dimensionality of ambient space,
+        mfld_fracs : array (#(V),)
+            ndarray of fractions of ranges of intrinsic coords to keep
+    uni_opts
+            dict of scalar options, used for all parameter values, with fields:
+        prob
+            allowed failure probability
+        num_samp
+            number of samples of distortion for empirical distribution
+        batch
+            sampled projections are processed in batches of this length.
+            The different batches are looped over (mem version).
+    mfld_info
+            dict of parameters for manifold sampling, with fields:
+        points
+            tuple of numbers of scattered points in each k-d slice, (max(K),)
+        L
+            tuple of ranges of intrinsic coords, (max(K),):
+                [-intr_range, intr_range]
+        lambda
+            tuple of std devs of gauss cov along each intrinsic axis, (max(K),)
+        feat
+            number of random Fourier features
+    """
+    # choose parameters
+    np.random.seed(0)
+    epsilons = np.array([0.2, 0.3])
+    proj_dims = np.linspace(4, 200, 5, dtype=int)
+    # dimensionality of ambient space
+    amb_dims = np.geomspace(250, 1000, num=3, dtype=int)
+    mfld_fracs = np.logspace(-3, 0, num=4, base=2)
+
+    param_ranges = {'eps': epsilons,
+                    'M': proj_dims,
+                    'N': amb_dims,
+                    'Vfr': mfld_fracs}
+
+    uni_opts = {'prob': 0.05,
+                'samples': 20,
+                'batch': 5}
+
+    mfld_info = {'points': (32, 256, 1024, 2048)[:num_dim],  # in each slice
+                 'L': (64.0,) * num_dim,  # x-coordinate lies between +/- this
+                 'lambda': (8.0,) * num_dim,  # correlation lengths
+                 'feat': 1024}  # number of random features
+
+    return param_ranges, uni_opts, mfld_info
+
 # =============================================================================
 # %%* running code
 # =============================================================================
@@ -10,7 +10,8 @@
 Utilities for calculation of distribution of maximum distortion of Gaussian
 random manifolds under random projections, low memory version
 """
-from typing import Dict, Optional, Sequence, List
+from typing import (Dict, Iterable, Iterator, List, Optional, Sequence,
+                    Tuple)
 from numbers import Real
 from math import floor
 import numpy as np
@@ -19,6 +20,7 @@ from numpy import ndarray as array
 from ..proj import intra_cell as ic
 from ..mfld import gauss_mfld as gm
 from ..iter_tricks import dcontext
+from ..myarray import BufferArena, buffer, matmul, mt
 
 
 def endval(param_dict: Dict[str, array],
@@ -112,6 +114,69 @@ def region_indices(shape: Sequence[int],
     return lin_inds
 
 
+def slice_points(num_pts: Sequence[int]) -> array:
+    """
+    Scattered points in nested slices through the centre of the manifold.
+
+    The points in slice k fill the first k intrinsic dimensions with a low
+    discrepancy sequence, with the remaining coordinates at the centre.
+    This replaces the grid, whose size grows exponentially with K.
+
+    Parameters
+    ----------
+    num_pts
+        tuple of numbers of points in each k-d slice, (max(K),)
+
+    Returns
+    -------
+    points
+        intrinsic coordinates of points, in units of the range of intrinsic
+        coords, between -1 and 1, (sum(num_pts), max(K))
+    """
+    K = len(num_pts)
+    points = np.zeros((sum(num_pts), K))
+    start = 0
+    for k, num in enumerate(num_pts):
+        points[start:start + num, :k+1] = 2 * gm.halton_points(num, k+1) - 1
+        start += num
+    return points
+
+
+def region_indices_points(points: array, mfld_frac: float) -> List[array]:
+    """
+    Indices of scattered points in the central region of the manifold.
+
+    Like `region_indices`, but selects points by their coordinates, without
+    enumerating a grid. Smaller `mfld_frac` is guaranteed to return a subset
+    of larger `mfld_frac`.
+
+    Parameters
+    ----------
+    points
+        intrinsic coordinates of points, in units of the range of intrinsic
+        coords, e.g. from `slice_points`, (L, max(K))
+    mfld_frac
+        fraction of manifold to keep
+
+    Returns
+    -------
+    lin_inds
+        set of indices of points on manifold, restricted to
+        K-d central region, (#(K),)(#(points),)
+    """
+    # points inside region in each dimension, (L,K)
+    inside = np.abs(points) <= mfld_frac
+    # points at centre in each dimension, needed for lower K, (L,K)
+    middle = points == 0
+    # cumulative from start / end: first k inside, last K-k in middle
+    inside = np.logical_and.accumulate(inside, axis=-1)
+    middle = np.logical_and.accumulate(middle[:, ::-1], axis=-1)[:, ::-1]
+    middle = np.concatenate((middle[:, 1:], np.ones_like(middle[:, :1])),
+                            axis=-1)
+    return [np.flatnonzero(inside[:, k] & middle[:, k])
+            for k in range(points.shape[-1])]
+
+
 # =============================================================================
 # %%* generate projection
 # =============================================================================
@@ -119,7 +184,9 @@ def region_indices(shape: Sequence[int],
 
 def project_mfld(mfld: gm.SubmanifoldFTbundle,
                  proj_dim: int,
-                 num_samp: int) -> gm.SubmanifoldFTbundle:
+                 num_samp: int,
+                 arena: Optional[BufferArena] = None
+                 ) -> gm.SubmanifoldFTbundle:
     """Project manifold and gauss_map
 
     Parameters
@@ -136,6 +203,9 @@ def project_mfld(mfld: gm.SubmanifoldFTbundle,
         M, dimensionalities of projected space (#(M),)
     num_samp
         S, # samples of projectors for empirical distribution
+    arena
+        store of work arrays, reused when called in a loop.
+        If given, the outputs are overwritten by the next call.
 
     Returns
     -------
@@ -148,19 +218,141 @@ def project_mfld(mfld: gm.SubmanifoldFTbundle,
     """
     with dcontext('Projections'):
         # sample projectors, (S,N,M)
-        projs = ic.make_basis(num_samp, mfld.ambient, proj_dim)
+        projs = ic.make_basis(num_samp, mfld.ambient, proj_dim,
+                              out=buffer(arena, 'projs',
+                                         (num_samp, mfld.ambient, proj_dim)))
     with dcontext('Projecting'):
         proj_mflds = gm.SubmanifoldFTbundle()
         proj_mflds.ambient = proj_dim
         proj_mflds.intrinsic = mfld.intrinsic
         proj_mflds.shape = (num_samp,) + mfld.shape
         # projected manifold for each sampled proj, (S,Lx*Ly...,M)
-        proj_mflds.mfld = mfld.mfld @ projs
+        proj_mflds.mfld = matmul(mfld.mfld, projs,
+                                 out=buffer(arena, 'mfld', (num_samp,)
+                                            + mfld.mfld.shape[:-1]
+                                            + (proj_dim,)))
         # gauss map of projected mfold for each proj, (S,L,M,K)
-        proj_mflds.gmap = projs.t[:, None] @ mfld.gmap
+        proj_mflds.gmap = matmul(mt(projs)[:, None], mfld.gmap,
+                                 out=buffer(arena, 'gmap', (num_samp,)
+                                            + mfld.gmap.shape[:-2]
+                                            + (proj_dim, mfld.gmap.shape[-1])))
     return proj_mflds
 
 
+def project_mfld_blocks(blocks: Iterable[gm.SubmanifoldFTbundle],
+                        ambient_dims: Sequence[int],
+                        proj_dim: int,
+                        num_samp: int,
+                        rng: Optional[np.random.Generator] = None
+                        ) -> Iterator[Tuple[gm.SubmanifoldFTbundle,
+                                            gm.SubmanifoldFTbundle]]:
+    """Project manifold and gauss_map, one block of ambient dimensions at a
+    time, for each number of ambient dimensions
+
+    Parameters
+    ----------
+    blocks: Iterable[SubmanifoldFTbundle]
+        consecutive blocks of ambient dimensions of one manifold, flattened,
+        with `mfld` (L,Nb) and `grad` (L,Nb,K). Must have a boundary at each
+        of the `ambient_dims`.
+    ambient_dims
+        N, increasing numbers of ambient dimensions to use (#(N),)
+    proj_dim
+        max(M), dimensionality of projected space
+    num_samp
+        S, # samples of projectors for empirical distribution
+    rng
+        random number generator for projectors, so that the blocks can be
+        regenerated from the global one. If None, use the global one.
+
+    Yields
+    ------
+    mfld: SubmanifoldFTbundle
+        mfld[st...,i]
+            = phi_i(x[s],y[t],...), (L,min(L,N)), rotated so that only
+            distances between points are preserved.
+    proj_mflds: SubmanifoldFTbundle
+        mfld[q,st...,i]
+            phi_i(x[s],y[t],...),  (S,L,M),
+            projected manifolds, first index is sample #
+        gmap[q,st...,i,A]
+            e_A^i(x[s],y[t],...),  (S,L,M,K),
+            gauss map of projected manifolds, 1sts index is sample #
+        where M = min(max(M), N).
+    for each N in `ambient_dims`.
+
+    Notes
+    -----
+    The projectors are :math:`P = G C^{-T}`, with `G` Gaussian (N,M) and
+    :math:`C C^T = G^T G`, as in `intra_cell.make_basis`. The gauss map is
+    :math:`grad\\, C_g^{-T}`, with :math:`C_g C_g^T = grad^T grad`. So the
+    blocks only add to :math:`mfld\\, G`, :math:`G^T grad`, :math:`G^T G`
+    and :math:`grad^T grad`, and the rows of `G` for each block are sampled
+    as it arrives. Distances between unprojected points use the mfld if
+    `N <= L`, otherwise its (L,L) Gram matrix.
+    Memory is `O(S L M K + L min(L,N))`, for any N, plus one block.
+    """
+    ambient_dims = list(ambient_dims)
+    done = 0
+    for block in blocks:
+        if done == 0:
+            num_pts, K = block.grad.shape[0], block.grad.shape[-1]
+            # sums over ambient dims, (S,L,M), (S,M,L,K), (S,M,M), (L,K,K)
+            pmfld = np.zeros((num_samp, num_pts, proj_dim))
+            pgrad = np.zeros((num_samp, proj_dim, num_pts, K))
+            gauss = np.zeros((num_samp, proj_dim, proj_dim))
+            ggram = np.zeros((num_pts, K, K))
+            if ambient_dims[-1] <= num_pts:
+                chords = np.empty((num_pts, ambient_dims[-1]))
+            else:
+                chords = np.zeros((num_pts, num_pts))
+        amb = slice(done, done + block.ambient)
+        # rows of Gaussian matrices for this block, (S,Nb,M)
+        gauss_rows = (np.random if rng is None else rng).standard_normal(
+            (num_samp, block.ambient, proj_dim))
+        pmfld += block.mfld @ gauss_rows
+        # (S,M,Nb) @ (Nb,L*K) -> (S,M,L*K)
+        pgrad += (mt(gauss_rows) @ block.grad.swapaxes(0, 1).reshape(
+            (block.ambient, -1))).reshape(pgrad.shape)
+        gauss += mt(gauss_rows) @ gauss_rows
+        ggram += mt(block.grad) @ block.grad
+        if ambient_dims[-1] <= num_pts:
+            chords[:, amb] = block.mfld
+        else:
+            chords += block.mfld @ mt(block.mfld)
+        done = amb.stop
+        if done not in ambient_dims:
+            continue
+
+        M = min(proj_dim, done)
+        # C^{-1}, (S,M,M), C_g^{-T}, (L,K,K)
+        cinv = np.linalg.inv(np.linalg.cholesky(gauss[:, :M, :M]))
+        cginv = mt(np.linalg.inv(np.linalg.cholesky(ggram)))
+        proj_mflds = gm.SubmanifoldFTbundle()
+        proj_mflds.ambient = M
+        proj_mflds.intrinsic = K
+        proj_mflds.shape = (num_samp, num_pts)
+        proj_mflds.flat = True
+        proj_mflds.mfld = pmfld[..., :M] @ mt(cinv)
+        # (S,M,M) @ (S,M,L*K) -> (S,M,L,K) -> (S,L,M,K)
+        proj_grad = (cinv @ pgrad[:, :M].reshape((num_samp, M, -1))).reshape(
+            (num_samp, M, num_pts, K)).swapaxes(1, 2)
+        proj_mflds.gmap = proj_grad @ cginv
+        del proj_grad
+
+        mfld = gm.SubmanifoldFTbundle()
+        mfld.ambient = done
+        mfld.intrinsic = K
+        mfld.shape = (num_pts,)
+        mfld.flat = True
+        if ambient_dims[-1] <= num_pts:
+            mfld.mfld = chords[:, :done]
+        else:
+            evals, evecs = np.linalg.eigh(chords)
+            mfld.mfld = evecs * np.sqrt(np.maximum(evals, 0.))
+        yield mfld, proj_mflds
+
+
 # =============================================================================
 # %%* distortion calculations
 # =============================================================================
@@ -31,6 +31,7 @@ rpm_plot
 rpm_disp
     Display linear fits for Figure Figures 6&9, distortion of random manifolds
 """
+from typing import Optional
 import numpy as np
 # import matplotlib as mpl
 import matplotlib.pyplot as plt
@@ -53,7 +54,8 @@ fig_dir = 'Figures/'
 # =============================================================================
 
 
-def icc_data(long: bool = False, suffix: str = ''):
+def icc_data(long: bool = False, suffix: str = '', exact: bool = False,
+             num_workers: Optional[int] = None):
     """
     Generate data for Figure 2, chordal cone guarantee, and save in a .npz file
 
@@ -64,6 +66,11 @@ def icc_data(long: bool = False, suffix: str = ''):
         otherwise use parameters for a quick demo.
     suffix : str = ''
         appended to name of .npz file.
+    exact : bool = False
+        If true, find maximum distortion over chordal cone analytically,
+        otherwise sample vectors from the edge of the cone.
+    num_workers : Optional[int] = None
+        If not None, number of processes to spread the trials over.
     """
 #    # choose parameters
 #    np.random.seed(0)
@@ -82,7 +89,8 @@ def icc_data(long: bool = False, suffix: str = ''):
     else:
         opts = icc.quick_options()
 
-    icc.make_and_save(data_dir + 'intercell' + suffix, *opts)
+    icc.make_and_save(data_dir + 'intercell' + suffix, *opts, exact=exact,
+                      num_workers=num_workers)
 
 
 def icc_plot(save: bool = False, suffix: str = ''):